@@ -5,44 +5,83 @@ created by: Omar De La Hoz (oed7416@rit.edu)
 created on: 09/07/17
 """
 
-from flask import Flask, request, abort, jsonify
+from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.postgresql import *
-from sqlalchemy_utils import ChoiceType
-from flask_socketio import SocketIO
+from flask_migrate import Migrate
 from flask_login import LoginManager
-from saml import SamlRequest, SamlManager
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
+from saml import SamlManager
+from app.metrics import InstrumentedSocketIO
 
-# Create the app and add configuration.
-sentry_sdk.init()
-app = Flask(__name__, template_folder = 'static', static_folder = 'static/static')
-app.config.from_object('config')
-socketio = SocketIO(app)
-db = SQLAlchemy(app)
+# Extensions are created unbound, create_app() attaches them to an app.
+db = SQLAlchemy()
+
+# Records the latency and SQL statements of every handler, see /metrics.
+socketio = InstrumentedSocketIO()
+
+# Schema changes are applied with `flask db upgrade`, see migrations/.
+migrate = Migrate()
 
 # Setup flask-login
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = '/saml/login'
 
 # Setup python-saml-flask
 saml_manager = SamlManager()
-saml_manager.init_app(app)
-
-# Import each module created.
-from app.routes.controllers import *
-from app.users.controllers import *
-from app.committees.controllers import *
-from app.members.controllers import *
-from app.charges.controllers import *
-from app.actions.controllers import *
-from app.committee_notes.controllers import *
-from app.notes.controllers import *
-from app.notifications.controllers import *
-from app.minutes.controllers import *
-
-from app.actions.models import Actions
-from app.notes.models import Notes
-db.create_all()
+
+
+##
+## @brief      Creates the Charge Tracker app.
+##
+## @param      config    The configuration object or import path.
+## @param      handlers  False to skip the socket handlers, routes, login
+##                       and Sentry, for the worker, CLI scripts and
+##                       benchmarks that only need the database.
+##
+## @return     The Flask app.
+##
+def create_app(config = 'config', handlers = True):
+    app = Flask(__name__, template_folder = 'static', static_folder = 'static/static')
+    app.config.from_object(config)
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+
+    # Import the models so the metadata is complete for migrations.
+    from app.users import models
+    from app.committees import models
+    from app.members import models
+    from app.charges import models
+    from app.actions import models
+    from app.notes import models
+    from app.committee_notes import models
+    from app.notifications import models
+    from app.minutes import models
+    from app.invitations import models
+
+    if not handlers:
+        return app
+
+    import sentry_sdk
+    sentry_sdk.init()
+
+    login_manager.init_app(app)
+    saml_manager.init_app(app)
+
+    from app.routes.controllers import routes
+    app.register_blueprint(routes)
+
+    # Socket handlers are queued on import and registered by init_app,
+    # so every controller must be imported before it.
+    from app.users import controllers
+    from app.committees import controllers
+    from app.members import controllers
+    from app.charges import controllers
+    from app.actions import controllers
+    from app.committee_notes import controllers
+    from app.notes import controllers
+    from app.notifications import controllers
+    from app.minutes import controllers
+    from app.invitations import controllers
+
+    socketio.init_app(app, message_queue = app.config['SOCKETIO_MESSAGE_QUEUE'])
+    return app
@@ -5,18 +5,49 @@ created by: Chris Lemelin (cxl8826@rit.edu)
 created on: 03/23/18
 """
 
-from flask_socketio import emit
-from app.decorators import ensure_dict, get_user
+from flask_socketio import emit, join_room
+from app.decorators import ensure_dict, get_user, find_user
 from app import socketio, db
 from app.actions.models import *
 from app.charges.models import *
 from app.committees.models import *
+from app.authorization import is_member
 from app.actions.actions_response import Response
 from app.users.models import Users
+from app.rooms import charge_room
+
+
+##
+## @brief      Serializes an action for the action events.
+##
+##             The list is sent once by get_actions, later changes are
+##             sent to the charge's room as 'action_added' and
+##             'action_updated' events carrying a single action, and
+##             'action_removed' when it moves to another charge.
+##
+## @param      action  The action object.
+##
+## @return     Dictionary with the action data.
+##
+def serialize_action(action):
+    return {
+        "id": action.id,
+        "title": action.title,
+        "description": action.description,
+        "status": action.status,
+        "charge": action.charge,
+        "assigned_to": "{} {}".format(action.assigned_user.first_name, action.assigned_user.last_name),
+    }
+
 
 ## @brief      Gets the actions for a specific charge.
 ##
-## @param      charge_id     The charge identifier
+##             The client joins the charge's room to get later changes.
+##             Actions of private charges are only sent to members of
+##             the committee and admins.
+##
+## @param      charge_id     The charge identifier, or a dict with
+##                           "charge_id" and the "token" of the user.
 ## @param      broadcast     Flag to broadcast list of actions
 ##                           to all users.
 ##
@@ -24,17 +55,28 @@ from app.users.models import Users
 ##
 @socketio.on('get_actions')
 def get_actions(charge_id, broadcast = False):
-    actions = Actions.query.filter_by(charge= charge_id).all()
-    action_ser = [
-                    {
-                        "id": c.id,
-                        "title": c.title,
-                        "description": c.description,
-                        "status": c.status,
-                        "assigned_to": "{} {}".format(Users.query.filter_by(id = c.assigned_to).first().first_name, Users.query.filter_by(id = c.assigned_to).first().last_name),
-                    }
-                    for c in actions
-                ]
+    user_data = charge_id if type(charge_id) is dict else {}
+
+    if type(charge_id) is dict:
+        charge_id = user_data.get("charge_id")
+
+    charge = Charges.query.filter_by(id= charge_id).first()
+
+    if charge is None:
+        emit("get_actions", [], broadcast = broadcast)
+        return
+
+    if charge.private:
+        user = find_user(user_data)
+
+        if user is None or not (user.is_admin or is_member(user, charge.committee)):
+            emit("get_actions", Response.UsrNotAuth)
+            return
+
+    # Load the assignees in the same query to avoid one lookup per action.
+    actions = Actions.query.options(db.joinedload(Actions.assigned_user)).filter_by(charge= charge_id).all()
+    action_ser = [serialize_action(c) for c in actions]
+    join_room(charge_room(charge_id))
     emit("get_actions", action_ser, broadcast = broadcast)
 
 
@@ -92,7 +134,7 @@ def create_action(user, user_data):
 
     committee = Committees.query.filter_by(id = charge.committee).first()
     
-    if (committee not in user.committees and
+    if (not is_member(user, committee.id) and
         not user.is_admin and 
         committee.head != user.id):
         emit("create_action", Response.UsrNotAuth)
@@ -118,7 +160,7 @@ def create_action(user, user_data):
     try:
         db.session.commit()
         emit('create_action', Response.AddSuccess)
-        get_actions(charge.id, broadcast = True)
+        emit('action_added', serialize_action(action), room = charge_room(action.charge))
     except Exception as e:
         db.session.rollback()
         db.session.flush()
@@ -156,6 +198,8 @@ def edit_action(user, user_data):
         emit('edit_action', Response.UsrNotAuth)
         return
 
+    old_charge = action.charge
+
     for key in user_data:
 
         if (key == "title" or key == "description" or key == "assigned_to" or
@@ -168,7 +212,10 @@ def edit_action(user, user_data):
         # Send successful edit notification to user
         # and broadcast charge changes.
         emit("edit_action", Response.EditSuccess)
-        get_actions(charge.id,broadcast= True)
+
+        if action.charge != old_charge:
+            emit("action_removed", {"id": action.id, "charge": old_charge}, room= charge_room(old_charge))
+        emit("action_updated", serialize_action(action), room= charge_room(action.charge))
     except Exception as e:
         db.session.rollback()
         emit("edit_action", Response.EditError)
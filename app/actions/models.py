@@ -15,8 +15,9 @@ class Actions(db.Model):
 	id = db.Column(db.Integer, primary_key=True, unique=True)
 	title = db.Column(db.String(255))
 	description = db.Column(db.String)
-	assigned_to = db.Column(db.ForeignKey('users.id'))
-	charge = db.Column(db.ForeignKey('charges.id'))
+	assigned_to = db.Column(db.ForeignKey('users.id'), index= True)
+	assigned_user = db.relationship('Users', foreign_keys= [assigned_to])
+	charge = db.Column(db.ForeignKey('charges.id'), index= True)
 	notes = db.relationship('Notes', backref='actions', lazy='dynamic')
 	created_at = db.Column(db.DateTime, server_default= db.func.now())
 	status = db.Column(db.Integer)
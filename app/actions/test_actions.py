@@ -8,7 +8,8 @@ created on: 03/23/18
 import pytest
 import config
 from mock import patch, MagicMock
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from app.actions.actions_response import Response
 from app.actions.models import *
 from app.committees.models import *
@@ -16,10 +17,13 @@ from app.charges.models import *
 from app.users.permissions import Permissions
 from app.users.models import Users
 from app.notifications.controllers import new_action, new_committee
+from app.query_counter import QueryCounter
+from app.rooms import charge_room
 from flask_socketio import SocketIOTestClient
-from flask_sqlalchemy import SQLAlchemy
 import base64
 
+app = create_app('config_testing')
+
 
 class TestAction(object):
 
@@ -28,7 +32,8 @@ class TestAction(object):
         self.app = app.test_client()
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -40,6 +45,7 @@ class TestAction(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         # Create admin user for tests.
         admin = Users(id = "adminuser")
@@ -132,6 +138,7 @@ class TestAction(object):
         db.session.close()
         db.drop_all()
         self.socketio.disconnect()
+        self.context.pop()
 
     # Test creating an action
     def test_create_action(self):
@@ -147,6 +154,26 @@ class TestAction(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.AddSuccess
 
+    # Test creating an action sends only the new action to the charge room.
+    def test_create_action_delta(self):
+        self.socketio.emit('get_actions', 10)
+        self.socketio.get_received()
+
+        user_data = {
+            "token": self.admin_token,
+            "charge": 10,
+            "assigned_to": "testuser2",
+            "title": "test title",
+            "description": "test description"
+        }
+
+        self.socketio.emit('create_action', user_data)
+        received = self.socketio.get_received()
+        assert received[1]["name"] == "action_added"
+        assert received[1]["args"][0]["title"] == "test title"
+        assert received[1]["args"][0]["assigned_to"] == "Test2 User2"
+        assert received[1]["args"][0]["charge"] == 10
+
     # Test creating an action with no description
     def test_create_action_no_description(self):
         user_data = {
@@ -212,13 +239,31 @@ class TestAction(object):
             'title': 'Test Action',
             'assigned_to': 'Test1 User',
             'description': 'Test Description',
-            'status': 0
+            'status': 0,
+            'charge': 10
         }]
 
         self.socketio.emit('get_actions', 10)
         received = self.socketio.get_received()
         assert received[0]["args"][0] == response_data
 
+    # Test the actions of a private charge are only sent to members.
+    def test_get_actions_private(self):
+        client = socketio.test_client(app)
+        self.test_charge.private = True
+        db.session.commit()
+
+        client.emit('get_actions', {"charge_id": 10, "token": self.user_token2})
+        received = client.get_received()
+        assert received[0]["args"][0] == Response.UsrNotAuth
+        assert charge_room(10) not in socketio.server.rooms(client.sid)
+
+        client.emit('get_actions', {"charge_id": 10, "token": self.admin_token})
+        received = client.get_received()
+        assert received[0]["args"][0][0]["id"] == 10
+        assert charge_room(10) in socketio.server.rooms(client.sid)
+        client.disconnect()
+
     # Test getting an action without a valid charge
     def test_get_actions_invalid_id(self):
         response_data = []
@@ -228,6 +273,30 @@ class TestAction(object):
         assert received[0]["args"][0] == response_data
 
 
+    # Test that getting actions doesn't query once per action.
+    def test_get_actions_query_count(self):
+        with QueryCounter() as counter:
+            self.socketio.emit('get_actions', 10)
+        self.socketio.get_received()
+        single_count = counter.count
+
+        for count in range(20):
+            action = Actions(id = 100 + count)
+            action.title = "Test Action " + str(count)
+            action.description = "Test Description"
+            action.assigned_to = self.test_user2.id
+            action.charge = 10
+            action.status = 0
+            db.session.add(action)
+        db.session.commit()
+
+        with QueryCounter() as counter:
+            self.socketio.emit('get_actions', 10)
+        received = self.socketio.get_received()
+
+        assert len(received[0]["args"][0]) == 21
+        assert counter.count == single_count
+
     # Test getting an action without a valid charge
     def test_get_action(self):
         response_data = {
@@ -250,6 +319,9 @@ class TestAction(object):
 
     # Test editing an action
     def test_edit_action(self):
+        self.socketio.emit('get_actions', 10)
+        self.socketio.get_received()
+
         user_data = {
             'id': 10,
             'token': self.admin_token,
@@ -259,6 +331,35 @@ class TestAction(object):
         self.socketio.emit('edit_action', user_data)
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.EditSuccess
+        assert received[1]["name"] == "action_updated"
+        assert received[1]["args"][0]["title"] == "Test Action 10"
+
+    # Test moving an action removes it from the old charge's room.
+    def test_edit_action_move_charge(self):
+        charge = Charges(id = 11)
+        charge.author = "testuser"
+        charge.title = "Test Charge 2"
+        charge.description = "Test Description"
+        charge.committee = "testcommittee"
+        charge.priority = 0
+        charge.status = 0
+        db.session.add(charge)
+        db.session.commit()
+
+        self.socketio.emit('get_actions', 10)
+        self.socketio.get_received()
+
+        user_data = {
+            'id': 10,
+            'token': self.admin_token,
+            'charge': 11,
+        }
+
+        self.socketio.emit('edit_action', user_data)
+        received = self.socketio.get_received()
+        assert received[0]["args"][0] == Response.EditSuccess
+        assert received[1]["name"] == "action_removed"
+        assert received[1]["args"][0] == {"id": 10, "charge": 10}
 
     # Test nonexisting action.
     def test_edit_non_existing(self):
@@ -0,0 +1,70 @@
+"""
+filename: authorization.py
+description: Committee roles of users for permission checks.
+created on: 10/18/26
+"""
+
+from app import db
+from app.cache import TTLCache
+from app.members.models import Members
+from sqlalchemy import select
+import config
+
+
+##
+## Handlers check a user's role in a committee with committee_role
+## instead of querying their membership. The roles of a user in every
+## committee are loaded with one query and cached for
+## MEMBERSHIP_CACHE_TTL seconds.
+##
+## Handlers that add, remove or change memberships must call
+## forget_memberships with the affected users after committing. That
+## only clears the cache of the process that made the change, when
+## running several processes the others keep the old roles for up to
+## MEMBERSHIP_CACHE_TTL seconds (30 by default), so it is kept short.
+##
+
+# Maps a user id to a dict of committee id to Roles.
+membership_cache = TTLCache(config.MEMBERSHIP_CACHE_SIZE, config.MEMBERSHIP_CACHE_TTL)
+
+
+##
+## @brief      Gets the roles of a user in their committees.
+##
+## @param      user_id  The user id.
+##
+## @return     Dict of committee id to the member's Roles.
+##
+def committee_roles(user_id):
+    roles = membership_cache.get(user_id)
+
+    if roles is None:
+        query = select([Members.committees_id, Members.role]).where(Members.users_id == user_id)
+        roles = dict(db.session.execute(query).fetchall())
+        membership_cache.set(user_id, roles)
+    return roles
+
+
+##
+## @brief      Gets the role of a user in a committee.
+##
+## @param      user          The user object, may be None.
+## @param      committee_id  The committee id.
+##
+## @return     The user's Roles in the committee, None if they are not
+##             a member.
+##
+def committee_role(user, committee_id):
+    if user is None:
+        return None
+    return committee_roles(user.id).get(committee_id)
+
+
+def is_member(user, committee_id):
+    return committee_role(user, committee_id) is not None
+
+
+## Drops the cached roles of some users.
+def forget_memberships(*user_ids):
+    for user_id in user_ids:
+        membership_cache.pop(user_id)
@@ -0,0 +1,80 @@
+"""
+filename: cache.py
+description: Small in-process cache with a size bound and expiry.
+created on: 10/18/26
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+##
+## @brief      Bounded least-recently-used cache whose entries expire
+##             after a fixed number of seconds.
+##
+##             Entries are local to the process, so anything stored here
+##             must be safe to serve stale for up to `ttl` seconds.
+##
+class TTLCache():
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    ##
+    ## @brief      Gets a value from the cache.
+    ##
+    ## @param      key      The key to look up.
+    ## @param      default  Returned when the key is missing or expired.
+    ##
+    ## @return     The cached value or default.
+    ##
+    def get(self, key, default = None):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                return default
+
+            expires, value = entry
+
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    ##
+    ## @brief      Stores a value, evicting the least recently used
+    ##             entry if the cache is full.
+    ##
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last = False)
+
+    ## Removes a key from the cache, if present.
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    ## Removes every entry whose value matches the predicate.
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    ## Removes every entry.
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -5,40 +5,67 @@ created by: Omar De La Hoz (oed7416@rit.edu), Chris Lemelin (cxl8826@rit.edu)
 created on: 12/05/17
 """
 
-from flask_socketio import emit
+from flask_socketio import emit, close_room
 from app.decorators import ensure_dict, get_user
 from app import socketio, db
 from app.charges.models import *
 from app.committees.models import Committees
+from app.authorization import committee_role, is_member
 from app.members.models import Roles
 from app.charges.charges_response import Response
 from app.users.models import Users
 from app.invitations.controllers import send_close_request
+from app.rooms import charge_audience, charge_room, join_committee_view
+from app.pagination import wants_page, paginate
+from flask_socketio import join_room
+
+
+##
+## @brief      Serializes a charge for the charge events.
+##
+##             Lists are sent once by get_charges and get_all_charges,
+##             later changes are sent to the committee's rooms as
+##             'charge_added' and 'charge_updated' events carrying a
+##             single charge. 'charge_removed' carries the id and old
+##             committee of a charge that left a room, it is always
+##             sent before the matching 'charge_updated' so clients
+##             can treat updates as inserts.
+##
+## @param      charge  The charge object.
+##
+## @return     Dictionary with the charge data.
+##
+def serialize_charge(charge):
+    return {
+        "id": charge.id,
+        "title": charge.title,
+        "description": charge.description,
+        "committee": charge.committee,
+        "priority": charge.priority,
+        "status": charge.status,
+        "paw_links": charge.paw_links,
+        "private": charge.private,
+        "created_at": charge.created_at.isoformat()
+    }
 
 ##
 ## @brief      Gets all public charges.
 ##
+## @param      user_data  Optional, "limit" and "cursor" to get a page.
 ## @param      broadcast  The broadcast
 ##
-## @return     All public charges.
+## @return     All public charges, or a page of them.
 ##
 @socketio.on('get_all_charges')
-def get_all_charges(broadcast = False):
+def get_all_charges(user_data = None, broadcast = False):
 
-    charges = Charges.query.filter_by(private = False).all()
-    charge_ser = []
+    query = Charges.query.filter_by(private = False)
+
+    if type(user_data) is dict and wants_page(user_data):
+        emit("get_all_charges", paginate(query, [Charges.created_at, Charges.id], user_data, serialize_charge))
+        return
 
-    for charge in charges:
-        charge_ser.append({
-            "id": charge.id,
-            "title": charge.title,
-            "description": charge.description,
-            "committee": charge.committee,
-            "priority": charge.priority,
-            "status": charge.status,
-            "paw_links": charge.paw_links,
-            "created_at": charge.created_at.isoformat()
-        });
+    charge_ser = [serialize_charge(charge) for charge in query.all()]
     emit("get_all_charges", charge_ser, broadcast = broadcast)
 
 
@@ -46,6 +73,7 @@ def get_all_charges(broadcast = False):
 ## @brief      Gets the charges for a specific committee.
 ##
 ## @param      committee_id  The committee identifier
+##                           ("limit" and "cursor" get a page)
 ## @param      broadcast     Flag to broadcast list of charges
 ##                           to all users.
 ##
@@ -60,24 +88,19 @@ def get_charges(user, user_data, broadcast = False):
     committee = Committees.query.filter_by(id = committee_id).first()
 
     if committee is not None:
-        membership = committee.members.filter_by(member= user).first()
-        if (user is not None and user.is_admin) or membership is not None:
-            charges = Charges.query.filter_by(committee= committee_id).all()
+        can_view_private = (user is not None and user.is_admin) or is_member(user, committee.id)
+        if can_view_private:
+            query = Charges.query.filter_by(committee= committee_id)
         else:
-            charges = Charges.query.filter_by(committee= committee_id, private = False).all()
-
-        for charge in charges:
-            charge_ser.append({
-                "id": charge.id,
-                "title": charge.title,
-                "description": charge.description,
-                "committee": charge.committee,
-                "priority": charge.priority,
-                "status": charge.status,
-                "paw_links": charge.paw_links,
-                "private": charge.private,
-                "created_at": charge.created_at.isoformat()
-            })
+            query = Charges.query.filter_by(committee= committee_id, private = False)
+
+        join_committee_view(committee.id, members= can_view_private)
+
+        if wants_page(user_data):
+            emit("get_charges", paginate(query, [Charges.created_at, Charges.id], user_data, serialize_charge))
+            return
+
+        charge_ser = [serialize_charge(charge) for charge in query.all()]
 
     emit("get_charges", charge_ser, broadcast = broadcast)
 
@@ -104,25 +127,15 @@ def get_charge(user, user_data, broadcast = False):
         return
 
     committee = Committees.query.filter_by(id = charge.committee).first()
-    membership = committee.members.filter_by(member= user).first()
+    can_view_private = user is not None and (user.is_admin or is_member(user, committee.id))
 
-    if charge.private:
-        if user is None or (not user.is_admin and membership is None):
-            emit('get_charge', Response.PermError)
-            return
+    if charge.private and not can_view_private:
+        emit('get_charge', Response.PermError)
+        return
 
-    charge_info = {
-        "id": charge.id,
-        "title": charge.title,
-        "description": charge.description,
-        "committee": charge.committee,
-        "priority": charge.priority,
-        "status": charge.status,
-        "paw_links": charge.paw_links,
-        "private": charge.private,
-        "created_at": charge.created_at.isoformat()
-    }
-    emit('get_charge', charge_info, broadcast= broadcast)
+    join_committee_view(committee.id, members= can_view_private)
+    join_room(charge_room(charge.id))
+    emit('get_charge', serialize_charge(charge), broadcast= broadcast)
 
 
 ##
@@ -202,7 +215,7 @@ def create_charge(user, user_data):
     try:
         db.session.commit()
         emit('create_charge', Response.AddSuccess)
-        get_charges(user_data, broadcast= True)
+        emit('charge_added', serialize_charge(charge), room= charge_audience(charge.committee, charge.private))
     except Exception as e:
         db.session.rollback()
         db.session.flush()
@@ -252,9 +265,9 @@ def edit_charge(user, user_data):
         return
 
     committee = Committees.query.filter_by(id = charge.committee).first()
-    membership = committee.members.filter_by(member= user).first()
+    role = committee_role(user, committee.id)
 
-    if (membership is None or membership.role != Roles.CommitteeHead) and not user.is_admin:
+    if role != Roles.CommitteeHead and not user.is_admin:
         emit("edit_charge", Response.PermError)
         return
     
@@ -264,6 +277,9 @@ def edit_charge(user, user_data):
         emit("edit_charge", Response.PermError)
         return
 
+    old_audience = charge_audience(charge.committee, charge.private)
+    was_private = charge.private
+
     for key in user_data:
         if (key == "description" or key == "title" or key == "priority" or
             key == "status" or key == "paw_links" or key == "private" or key == "committee"):
@@ -272,10 +288,19 @@ def edit_charge(user, user_data):
     try:
         db.session.commit()
         # Send successful edit notification to user
-        # and broadcast charge changes.
+        # and send charge changes to the committee rooms.
         emit("edit_charge", Response.EditSuccess)
-        get_charge(user_data, broadcast= True)
-        get_charges(user_data, broadcast= True)
+        new_audience = charge_audience(charge.committee, charge.private)
+
+        if old_audience != new_audience:
+            emit("charge_removed", {"id": charge.id, "committee": committee.id}, room= old_audience)
+        emit("charge_updated", serialize_charge(charge), room= new_audience)
+
+        # Anyone could join the charge room while it was public, empty it
+        # so action and note changes stop reaching non members. Members
+        # join it again with get_charge or get_actions.
+        if charge.private and not was_private:
+            close_room(charge_room(charge.id))
     except Exception as e:
         db.session.rollback()
         emit("edit_charge", Response.EditError)
@@ -305,15 +330,15 @@ def close_charge(user, user_data):
         return
 
     committee = Committees.query.filter_by(id = user_data.get("committee_id",-1)).first()
-    membership = committee.members.filter_by(member= user).first()
+    role = committee_role(user, committee.id)
 
     # User is NOT admin or Committee-head
-    if (membership is None or membership.role != Roles.CommitteeHead) and not user.is_admin:
+    if role != Roles.CommitteeHead and not user.is_admin:
         emit("close_charge", Response.PermError)
         return
 
     # User is Committee-head
-    if (membership.role == Roles.CommitteeHead) and not user.is_admin:
+    if role == Roles.CommitteeHead and not user.is_admin:
         send_close_request(user, committee, charge.id)
         emit("close_charge", Response.CloseRequestSuccess)
         return
@@ -328,8 +353,7 @@ def close_charge(user, user_data):
         try:
             db.session.commit()
             emit("close_charge", Response.CloseSuccess)
-            get_charge(user_data, broadcast= True)
-            get_charges(user_data, broadcast= True)
+            emit("charge_updated", serialize_charge(charge), room= charge_audience(charge.committee, charge.private))
         except Exception as e:
             db.session.rollback()
             emit("close_charge", Response.CloseError)
@@ -29,3 +29,8 @@ class Charges(db.Model):
     priority = db.Column(db.Integer)
     status = db.Column(db.Integer)
     private = db.Column(db.Boolean)
+
+    # Covers the committee lookups as well as committee + private.
+    __table_args__ = (
+        db.Index('ix_charges_committee_private', 'committee', 'private'),
+    )
@@ -7,7 +7,8 @@ created on: 03/21/18
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from app.charges.charges_response import Response
 from app.committees.models import Committees
 from app.users.permissions import Permissions
@@ -16,7 +17,10 @@ from app.members.models import Members, Roles
 from app.users.models import Users
 from flask_socketio import SocketIOTestClient
 from app.notifications.controllers import new_committee
-from flask_sqlalchemy import SQLAlchemy
+from app.rooms import charge_room
+
+app = create_app('config_testing')
+
 
 class TestCharges(object):
 
@@ -25,7 +29,8 @@ class TestCharges(object):
         self.app = app.test_client()
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -39,11 +44,13 @@ class TestCharges(object):
         db.session.close()
         db.drop_all()
         self.socketio.disconnect()
+        self.context.pop()
 
     @classmethod
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         # Create admin user for tests.
         admin = Users(id = "adminuser")
@@ -165,6 +172,27 @@ class TestCharges(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.AddSuccess
 
+    # Test creating a charge sends only the new charge to the committee room.
+    def test_create_charge_delta(self):
+        self.socketio.emit('get_charges', {"committee_id": "testcommittee"})
+        self.socketio.get_received()
+
+        user_data = {
+            "token": self.admin_token,
+            "title": "test charge",
+            "priority": 0,
+            "description": "test description",
+            "committee": "testcommittee",
+            "private": False,
+            "status": 1
+        }
+
+        self.socketio.emit('create_charge', user_data)
+        received = self.socketio.get_received()
+        assert received[1]["name"] == "charge_added"
+        assert received[1]["args"][0]["title"] == "test charge"
+        assert received[1]["args"][0]["committee"] == "testcommittee"
+
     def test_head_create_charge(self):
         user_data = {
             "token": self.user_token,
@@ -373,6 +401,30 @@ class TestCharges(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == []
 
+    # Test paging through charges while new charges are added.
+    def test_get_charges_pages_stable(self):
+        for charge_id in range(11, 15):
+            db.session.add(Charges(id = charge_id, title = "Test Charge", committee = "testcommittee", private = False))
+            db.session.commit()
+
+        user_data = {"token": self.admin_token, "committee_id": "testcommittee", "limit": 2}
+        pages = []
+
+        while True:
+            self.socketio.emit('get_charges', user_data)
+            page = self.socketio.get_received()[0]["args"][0]
+            pages.append([charge["id"] for charge in page["items"]])
+
+            # A charge created between pages must not shift the next page.
+            db.session.add(Charges(id = 100 + len(pages), title = "New Charge", committee = "testcommittee", private = False))
+            db.session.commit()
+
+            if page["next_cursor"] is None:
+                break
+            user_data["cursor"] = page["next_cursor"]
+
+        assert pages == [[14, 13], [12, 11], [10]]
+
     # Get all public charges.
     def test_get_all_charges(self):
         self.socketio.emit('get_all_charges')
@@ -388,10 +440,74 @@ class TestCharges(object):
         }
         self.charge_dict["title"] = user_data["title"]
 
+        self.socketio.emit('get_charges', {"token": self.admin_token, "committee_id": "testcommittee"})
+        self.socketio.get_received()
+
         self.socketio.emit('edit_charge', user_data)
         received = self.socketio.get_received()
+        assert received[1]["name"] == "charge_updated"
         assert received[1]["args"][0] == self.charge_dict
 
+    # Test private charge changes are not sent to non members.
+    def test_edit_charge_private_room(self):
+        client = socketio.test_client(app)
+        client.emit('get_charges', {"token": self.user_token2, "committee_id": "testcommittee"})
+        client.get_received()
+
+        user_data = {
+            "token": self.admin_token,
+            "charge": 10,
+            "title": "this is the new title"
+        }
+        self.socketio.emit('edit_charge', user_data)
+        self.socketio.get_received()
+        received = client.get_received()
+        client.disconnect()
+
+        assert received == []
+
+    # Test making a charge public sends it to non members.
+    def test_edit_charge_public_room(self):
+        client = socketio.test_client(app)
+        client.emit('get_charges', {"token": self.user_token2, "committee_id": "testcommittee"})
+        client.get_received()
+
+        user_data = {
+            "token": self.admin_token,
+            "charge": 10,
+            "title": "Test Charge",
+            "private": False
+        }
+        self.socketio.emit('edit_charge', user_data)
+        self.socketio.get_received()
+        received = client.get_received()
+        client.disconnect()
+
+        assert received[0]["name"] == "charge_updated"
+        assert received[0]["args"][0]["private"] == False
+
+    # Test making a charge private removes non members from its room.
+    def test_edit_charge_private_closes_room(self):
+        self.charge.private = False
+        db.session.commit()
+
+        client = socketio.test_client(app)
+        client.emit('get_charge', {"token": self.user_token2, "charge": 10})
+        client.get_received()
+        assert charge_room(10) in socketio.server.rooms(client.sid)
+
+        user_data = {
+            "token": self.admin_token,
+            "charge": 10,
+            "title": "Test Charge",
+            "private": True
+        }
+        self.socketio.emit('edit_charge', user_data)
+        self.socketio.get_received()
+
+        assert charge_room(10) not in socketio.server.rooms(client.sid)
+        client.disconnect()
+
     def test_edit_charge_no_id(self):
 
         user_data = {
@@ -442,9 +558,15 @@ class TestCharges(object):
 
         self.charge_dict["committee"] = user_data["committee"]
 
+        self.socketio.emit('get_charges', {"token": self.admin_token, "committee_id": self.committee.id})
+        self.socketio.emit('get_charges', {"token": self.admin_token, "committee_id": self.committee2.id})
+        self.socketio.get_received()
+
         self.socketio.emit('edit_charge', user_data)
         received = self.socketio.get_received()
-        assert received[1]["args"][0] == self.charge_dict
+        assert received[1]["name"] == "charge_removed"
+        assert received[1]["args"][0] == {"id": 10, "committee": self.committee.id}
+        assert received[2]["args"][0] == self.charge_dict
 
     def test_edit_charge_change_committee_no_perm(self):
         user_data = {
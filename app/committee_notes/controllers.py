@@ -12,6 +12,7 @@ from app.committee_notes.models import *
 from app.committees.models import *
 from app.users.models import Users
 from app.committee_notes.committee_notes_response import Response
+from app.pagination import wants_page, paginate
 
 
 
@@ -54,25 +55,37 @@ def create_note(user_data):
     else:
     	emit("create_committee_note", Response.CommitteeDoesntExist)
 
+def serialize_committee_note(note):
+    return {
+        "id": note.id,
+        "author": note.author,
+        "committee": note.committee,
+        "description": note.description,
+        "created_at": note.created_at,
+        "hidden": note.hidden
+    }
+
 ##
 ## @brief      Gets committee notes from a committee
 ##
-## @param      committee_id     - id of the committee
+## @param      committee_id     - id of the committee, or a dict with
+##                                "committee_id", "limit" and "cursor"
+##                                to get a page.
 ##
 @socketio.on('get_committee_notes')
 def get_notes(committee_id, broadcast = False):
-    notes = CommitteeNotes.query.filter_by(committee= committee_id).all()
-    note_ser = [
-                    {
-                        "id": c.id,
-                        "author": c.author,
-                        "committee": c.committee,
-                        "description": c.description,
-                        "created_at": c.created_at,
-                        "hidden": c.hidden
-                    }
-                    for c in notes
-                ]
+    page = committee_id if type(committee_id) is dict else None
+
+    if page is not None:
+        committee_id = page.get("committee_id")
+
+    query = CommitteeNotes.query.filter_by(committee= committee_id)
+
+    if page is not None and wants_page(page):
+        emit("get_committee_notes", paginate(query, [CommitteeNotes.created_at, CommitteeNotes.id], page, serialize_committee_note))
+        return
+
+    note_ser = [serialize_committee_note(c) for c in query.all()]
     emit("get_committee_notes", note_ser, broadcast = broadcast)
 
 ##
@@ -5,5 +5,6 @@ class CommitteeNotes(db.Model):
 	id = db.Column(db.Integer, primary_key=True, unique=True)
 	description = db.Column(db.String)
 	author = db.Column(db.ForeignKey('users.id'))
-	committee = db.Column(db.ForeignKey('committees.id'))
+	committee = db.Column(db.ForeignKey('committees.id'), index= True)
 	created_at = db.Column(db.DateTime, server_default= db.func.now())
+	hidden = db.Column(db.Boolean)
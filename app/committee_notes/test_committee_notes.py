@@ -7,7 +7,7 @@ created on: 04/23/18
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
 from app.committee_notes.committee_notes_response import Response
 from app.notifications.controllers import new_committee
 from app.committees.models import Committees
@@ -16,7 +16,9 @@ from app.users.permissions import Permissions
 from app.charges.models import *
 from app.users.models import Users
 from flask_socketio import SocketIOTestClient
-from flask_sqlalchemy import SQLAlchemy
+
+app = create_app('config_testing')
+
 
 class TestCommitteeNotes(object):
 
@@ -25,7 +27,8 @@ class TestCommitteeNotes(object):
         self.app = app.test_client()
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -39,6 +42,7 @@ class TestCommitteeNotes(object):
         db.drop_all()
         db.event.listen(Committees, "after_insert", new_committee)
         self.socketio.disconnect()
+        self.context.pop()
 
     @classmethod
     def setup_method(self, method):
@@ -200,6 +204,18 @@ class TestCommitteeNotes(object):
         assert received[0]["args"][0]["committee"] == 'testcommittee'
         assert received[0]["args"][0]["description"] == "Test Note"
 
+    # Test hiding a note is stored and sent with the note.
+    def test_modify_committee_notes_hidden(self):
+        user_data = {"token": self.admin_token,
+                     "id": 10,
+                     "hidden": True}
+        self.socketio.emit('modify_committee_note', user_data)
+        self.socketio.get_received()
+
+        self.socketio.emit('get_committee_note', '10')
+        received = self.socketio.get_received()
+        assert received[0]["args"][0]["hidden"] == True
+
     def test_get_committee_notes(self):
         self.socketio.emit('get_committee_notes', 'testcommittee')
 
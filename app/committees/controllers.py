@@ -10,12 +10,29 @@ from app.decorators import ensure_dict, get_user
 from app import socketio, db
 from app.committees.committees_response import Response
 from app.committees.models import Committees
+from app.authorization import is_member, forget_memberships
 from app.users.models import Users
 from app.members.models import Members, Roles
 from app.users.permissions import Permissions
+from app.rooms import committee_room, join_committee_view, leave_committee_members
 import base64
 
 
+##
+## @brief      Serializes a committee for the committee list events.
+##
+##             The list is sent once by get_committees, later changes
+##             are sent as 'committee_added' and 'committee_updated'
+##             events carrying a single committee.
+##
+## @param      committee  The committee object.
+##
+## @return     Dictionary with the committee data.
+##
+def serialize_committee(committee):
+    return {"id": committee.id, "title": committee.title, "enabled": committee.enabled}
+
+
 ##
 ## @brief      Gets list of all committees.
 ##
@@ -26,7 +43,7 @@ import base64
 @socketio.on('get_committees')
 def get_committees(broadcast = False):
     committees = Committees.query.filter_by().all()
-    comm_ser = [{"id": c.id, "title": c.title, "enabled": c.enabled} for c in committees]
+    comm_ser = [serialize_committee(c) for c in committees]
     emit("get_committees", comm_ser, broadcast= broadcast)
 
 
@@ -56,7 +73,7 @@ def get_permissions(user, user_data):
             elif user.id == committee.head:
 
                 permission_level = Permissions.CanCreate
-            elif committee.members.filter_by(member= user).first():
+            elif is_member(user, committee.id):
 
                 permission_level = Permissions.CanContribute
         emit('get_permissions', permission_level)
@@ -68,17 +85,23 @@ def get_permissions(user, user_data):
 ## @brief      Gets a specific committee by its id.
 ##
 ## @param      committee_id  The committee identifier
+## @param      room          Room to send the committee to, if not
+##                           defined it is sent to the client, which
+##                           joins the committee's room.
 ##
 ## @emit       An object containing a detailed view of a specific
 ##             committee.
 ##
 @socketio.on('get_committee')
-def get_committee(committee_id, broadcast = False):
+def get_committee(committee_id, room = None):
 
     committee = Committees.query.filter_by(id = committee_id).first()
 
     if committee is not None:
 
+        if room is None:
+            join_committee_view(committee.id)
+
         head = Users.query.filter_by(id = committee.head).first()
 
         committee_info = {
@@ -96,7 +119,7 @@ def get_committee(committee_id, broadcast = False):
             com_img = base64.b64encode(committee.committee_img).decode('utf-8')
             committee_info["committee_img"] = com_img
 
-        emit("get_committee", committee_info, broadcast= broadcast)
+        emit("get_committee", committee_info, room= room)
     else:
         emit('get_committee', Response.ComDoesntExist)
 
@@ -158,8 +181,9 @@ def create_committee(user, user_data):
                 try:
 
                     db.session.commit()
+                    forget_memberships(new_committee.head)
                     emit('create_committee', Response.AddSuccess)
-                    get_committees(broadcast= True)
+                    emit('committee_added', serialize_committee(new_committee), broadcast= True)
                 except Exception as e:
 
                     db.session.rollback()
@@ -217,6 +241,8 @@ def edit_committee(user, user_data):
             else:
                 setattr(committee, key, user_data[key])
 
+    forget_heads = []
+
     try:
 
         if "head" in user_data and committee.head != user_data["head"]:
@@ -228,15 +254,21 @@ def edit_committee(user, user_data):
             
             membership = committee.members.filter_by(users_id= committee.head).first()
             membership.member = new_head
+            forget_heads = [committee.head, new_head.id]
             committee.head = new_head.id
 
         db.session.commit()
+        forget_memberships(*forget_heads)
+
+        # The old head is no longer a member.
+        if forget_heads:
+            leave_committee_members(forget_heads[0], committee.id)
     
         # Send successful edit notification to user
         # and broadcast committee changes.
         emit("edit_committee", Response.EditSuccess)
-        get_committee(committee.id, broadcast= True)
-        get_committees(broadcast= True)
+        get_committee(committee.id, room= committee_room(committee.id))
+        emit("committee_updated", serialize_committee(committee), broadcast= True)
     except Exception as e:
         db.session.rollback()
         emit("edit_committee", Response.EditError)
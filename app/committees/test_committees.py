@@ -7,7 +7,8 @@ created on: 09/19/17
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from app.committees.committees_response import Response
 from app.committees.models import Committees
 from app.users.permissions import Permissions
@@ -16,7 +17,8 @@ from app.users.models import Users
 from app.notifications.controllers import new_committee
 from flask_socketio import SocketIOTestClient
 import base64
-from flask_sqlalchemy import SQLAlchemy
+
+app = create_app('config_testing')
 
 
 class TestCommittees(object):
@@ -27,7 +29,8 @@ class TestCommittees(object):
         
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -41,6 +44,7 @@ class TestCommittees(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         self.test_committee_dict = {
             "id" : "testcommittee",
@@ -96,6 +100,7 @@ class TestCommittees(object):
         db.drop_all()
         db.event.listen(Committees, "after_insert", new_committee)
         self.socketio.disconnect()
+        self.context.pop()
 
 
 
@@ -106,6 +111,18 @@ class TestCommittees(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.AddSuccess
 
+    # Test creating a committee sends only the new committee.
+    def test_create_committee_delta(self):
+        self.test_committee_dict["token"] = self.admin_token
+        self.socketio.emit('create_committee', self.test_committee_dict)
+        received = self.socketio.get_received()
+        assert received[1]["name"] == "committee_added"
+        assert received[1]["args"][0] == {
+            "id": "testcommittee",
+            "title": "testcommittee",
+            "enabled": True
+        }
+
     # Test when creating a committee that already exists.
     def test_create_committee_exists(self):
         db.session.add(self.test_committee)
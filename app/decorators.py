@@ -20,19 +20,35 @@ def ensure_dict(types):
     return wrapped
 
 
+##
+## @brief      Finds the user of an event, from the "token" in its data
+##             or from the connection's login.
+##
+## @param      user_data  The event data.
+##
+## @return     The user, None if there is none.
+##
+def find_user(user_data):
+    token = user_data.get("token", "")
+
+    if token != "" and token != None:
+        return Users.verify_auth(token)
+
+    # Connections that sent 'authenticate' don't need a token.
+    user = Users.from_session(request.sid)
+
+    if user is None and current_user.is_authenticated:
+        user = current_user
+    return user
+
+
 def get_user(f):
     @functools.wraps(f)
     def wrapped(*args, **kwargs):
 
-        user = None
-
-        if (args[0].get("token", "") != "" and 
-            args[0].get("token", "") != None):
-            user = Users.verify_auth(args[0].get("token",""))
-        elif current_user.is_authenticated:
-            user = current_user
+        user = find_user(args[0])
 
         if user: join_room(user.id)
 
         return f(user, *args, **kwargs)
-    return wrapped
\ No newline at end of file
+    return wrapped
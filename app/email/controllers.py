@@ -10,10 +10,79 @@ from email.mime.image import MIMEImage
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from app.email.models import huey
-from app import app
-import smtplib
+from app.email.pool import SMTPPool
+from huey import crontab
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 import config
+import json
+import os
+import threading
+import time
 
+# Images are read from disk so the worker does not need the Flask app.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+
+# SMTP sessions shared by the tasks of this worker.
+smtp_pool = SMTPPool(
+	config.MAIL_SERVER,
+	config.MAIL_PORT,
+	config.MAIL_USERNAME,
+	config.MAIL_PASSWORD,
+	use_tls = config.MAIL_USE_TLS,
+	size = config.MAIL_POOL_SIZE,
+	check_after = config.MAIL_POOL_CHECK_AFTER
+)
+
+# Templates rendered by the worker, without the Flask app.
+templates = Environment(loader = FileSystemLoader(STATIC_DIR), autoescape = select_autoescape(['html']))
+
+# Inline images of the email templates, (file, Content-ID).
+INLINE_IMAGES = [("sg-logo.png", "<sg-logo>"), ("paw.png", "<sg-paw>")]
+
+# Encoded image parts, built once per worker and shared by every message.
+image_parts = []
+image_lock = threading.Lock()
+
+
+##
+## @brief      Gets the inline image parts, reading the files the first
+##             time it is called.
+##
+## @return     List of MIMEImage parts.
+##
+def get_image_parts():
+	with image_lock:
+		if not image_parts:
+			for name, content_id in INLINE_IMAGES:
+				with open(os.path.join(STATIC_DIR, name), "rb") as fp:
+					part = MIMEImage(fp.read())
+				part.add_header('Content-ID', content_id)
+				image_parts.append(part)
+	return image_parts
+
+
+##
+## @brief      Builds the MIME message of an email.
+##
+## @param      msg   The message object, see send_email.
+##
+## @return     The MIMEMultipart message.
+##
+def build_message(msg):
+	mime = MIMEMultipart(msg["subtype"])
+	mime['Subject'] = msg["title"]
+	mime['From'] = formataddr(msg["sender"])
+	mime['To'] = ", ".join(msg["recipients"])
+
+	# Attatch html
+	msgHtml = MIMEText(msg["html"], 'html')
+	mime.attach(msgHtml)
+
+	# Attach images
+	for part in get_image_parts():
+		mime.attach(part)
+
+	return mime
 
 
 ##
@@ -31,35 +100,110 @@ import config
 
 @huey.task(retries= 5, retries_as_argument=True)
 def send_email(msg, retries):
-	mime = MIMEMultipart(msg["subtype"])
-	mime['Subject'] = msg["title"]
-	mime['From'] = formataddr(msg["sender"])
-	mime['To'] = ", ".join(msg["recipients"])
-
-	# Attatch html
-	msgHtml = MIMEText(msg["html"], 'html')
-	mime.attach(msgHtml)
-
-	# Attach images
-	with app.open_resource("static/sg-logo.png") as fp:
-		sg_logo = MIMEImage(fp.read())
-		sg_logo.add_header('Content-ID', '<sg-logo>')
-		mime.attach(sg_logo)
-		fp.close()
-
-	with app.open_resource("static/paw.png") as fp:
-		sg_paw = MIMEImage(fp.read())
-		sg_paw.add_header('Content-ID', '<sg-paw>')
-		mime.attach(sg_paw)
-		fp.close()
+	mime = build_message(msg)
 
 	try:
-		server = smtplib.SMTP(config.MAIL_SERVER, config.MAIL_PORT)
-		server.starttls()
-		server.login(config.MAIL_USERNAME, config.MAIL_PASSWORD)
-		server.sendmail(msg["sender"][1], msg["recipients"], mime.as_string())
+		smtp_pool.sendmail(msg["sender"][1], msg["recipients"], mime.as_string())
 		
 	except Exception as e:
 		if retries != 0: raise
 
-	server.quit()
+
+##
+## Digest mode, enabled by setting EMAIL_DIGEST_WINDOW to a number of
+## seconds. Emails sent with queue_email are kept in redis per recipient
+## instead of being sent, and send_digests, run every minute, sends each
+## recipient whose oldest pending email is older than the window a single
+## message with all of them. A recipient with only one pending email gets
+## it as it was rendered.
+##
+## Keys:
+##     email_digest:<recipient>   List of pending emails, as JSON.
+##     email_digest:since         Hash of recipient to the time of their
+##                                oldest pending email.
+##
+DIGEST_KEY = "email_digest:{}"
+DIGEST_SINCE_KEY = "email_digest:since"
+
+
+##
+## @brief      Sends an email, or adds it to the digest of each recipient
+##             when digest mode is enabled.
+##
+## @param      msg   The message object, see send_email.
+## @param      item  Line of the digest for this email, dict with:
+## 					 - text: What happened.
+## 					 - url: Link to it.
+## 					 - action: Text of the link.
+##
+## @return     None
+##
+def queue_email(msg, item):
+	if not config.EMAIL_DIGEST_WINDOW:
+		send_email(msg)
+		return
+
+	now = time.time()
+	pipe = huey.storage.conn.pipeline()
+
+	for recipient in msg["recipients"]:
+		pending = dict(msg, recipients = [recipient], item = item)
+		pipe.rpush(DIGEST_KEY.format(recipient), json.dumps(pending))
+		pipe.hsetnx(DIGEST_SINCE_KEY, recipient, now)
+
+	pipe.execute()
+
+
+##
+## @brief      Sends the digests whose window has passed.
+##
+## @return     None
+##
+@huey.periodic_task(crontab(minute = '*'))
+def send_digests():
+	conn = huey.storage.conn
+	cutoff = time.time() - config.EMAIL_DIGEST_WINDOW
+
+	for recipient, since in conn.hgetall(DIGEST_SINCE_KEY).items():
+		if float(since) > cutoff:
+			continue
+
+		recipient = recipient.decode()
+		key = DIGEST_KEY.format(recipient)
+
+		# Takes the pending emails atomically so none added meanwhile are lost.
+		pipe = conn.pipeline()
+		pipe.lrange(key, 0, -1)
+		pipe.delete(key)
+		pipe.hdel(DIGEST_SINCE_KEY, recipient)
+		pending = pipe.execute()[0]
+
+		if pending:
+			send_email(digest_message([json.loads(p) for p in pending]))
+
+
+##
+## @brief      Builds the message with the pending emails of a recipient.
+##
+## @param      emails  Pending emails added by queue_email, oldest first.
+##
+## @return     The message object, see send_email.
+##
+def digest_message(emails):
+	if len(emails) == 1:
+		msg = dict(emails[0])
+		msg.pop("item")
+		return msg
+
+	recipient = emails[0]["recipients"][0]
+	return {
+		"title": "{} updates from TigerTracker".format(len(emails)),
+		"sender": emails[0]["sender"],
+		"recipients": [recipient],
+		"subtype": "related",
+		"html": templates.get_template('email_digest.html').render(
+			recipient = recipient.split("@")[0],
+			items = [e["item"] for e in emails],
+			time_stamp = time.time()
+		)
+	}
@@ -0,0 +1,125 @@
+"""
+filename: pool.py
+description: Pool of authenticated SMTP connections for the email worker.
+created on: 10/18/26
+"""
+
+import queue
+import smtplib
+import socket
+import threading
+import time
+
+
+##
+## @brief      Keeps SMTP sessions open between tasks so each email does
+##             not pay for a new connection, STARTTLS and login.
+##
+##             Connections idle for more than `check_after` seconds are
+##             checked with NOOP before use. A connection the server
+##             dropped is closed and the message is sent once more on a
+##             new one, other errors close the connection and are raised.
+##
+class SMTPPool():
+
+    def __init__(self, host, port, username = '', password = '', use_tls = True,
+                 size = 4, check_after = 30, timeout = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.check_after = check_after
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize = size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    ## Opens and authenticates a new connection.
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout = self.timeout)
+
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    ##
+    ## @brief      Gets a working connection, reusing an idle one if the
+    ##             pool has any.
+    ##
+    def _acquire(self):
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < self.check_after:
+                return server
+
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(server)
+
+    def _release(self, server):
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._close(server)
+
+    ##
+    ## @brief      Sends a message.
+    ##
+    ## @param      sender      The envelope sender.
+    ## @param      recipients  List of recipient addresses.
+    ## @param      message     The message as a string.
+    ##
+    ## @return     Dict of refused recipients, as smtplib.SMTP.sendmail.
+    ##
+    def sendmail(self, sender, recipients, message):
+        server = self._acquire()
+
+        try:
+            refused = server.sendmail(sender, recipients, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+            # The server dropped an idle connection, retry on a new one.
+            self._close(server)
+            server = self._connect()
+            try:
+                refused = server.sendmail(sender, recipients, message)
+            except Exception:
+                self._close(server)
+                raise
+        except Exception:
+            self._close(server)
+            raise
+
+        self._release(server)
+        return refused
+
+    ## Closes every idle connection.
+    def close(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
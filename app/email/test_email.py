@@ -0,0 +1,283 @@
+"""
+filename: test_email.py
+description: Tests for the email worker.
+created on: 10/18/26
+"""
+
+import pytest
+import smtplib
+import socket
+import time
+from mock import patch
+from types import SimpleNamespace
+from aiosmtpd.controller import Controller
+from app.email.pool import SMTPPool
+from app.email.controllers import send_email, build_message, queue_email, digest_message, send_digests
+
+
+##
+## @brief      Local SMTP server that records the messages it receives
+##             and the sessions they arrived on.
+##
+class Recorder(object):
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return '250 OK'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+##
+## @brief      In-memory stand-in for the Redis connection of the huey
+##             storage, with the commands the digests use.
+##
+class FakeRedis(object):
+
+    def __init__(self):
+        self.lists = {}
+        self.hashes = {}
+        self.results = []
+
+    def pipeline(self):
+        self.results = []
+        return self
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+    def _done(self, result):
+        self.results.append(result)
+        return result
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode())
+        return self._done(len(self.lists[key]))
+
+    def lrange(self, key, start, end):
+        return self._done(list(self.lists.get(key, [])))
+
+    def delete(self, key):
+        return self._done(int(self.lists.pop(key, None) is not None))
+
+    def hsetnx(self, key, field, value):
+        fields = self.hashes.setdefault(key, {})
+        if field.encode() in fields:
+            return self._done(0)
+        fields[field.encode()] = str(value).encode()
+        return self._done(1)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, field):
+        return self._done(int(self.hashes.get(key, {}).pop(field.encode(), None) is not None))
+
+
+class TestEmail(object):
+
+    def setup_method(self, method):
+        self.recorder = Recorder()
+        self.controller = Controller(self.recorder, hostname= "127.0.0.1", port= free_port())
+        self.controller.start()
+        self.pool = SMTPPool("127.0.0.1", self.controller.port, use_tls= False)
+
+    def teardown_method(self, method):
+        self.pool.close()
+        self.controller.stop()
+
+    def send(self, pool, count):
+        start = time.perf_counter()
+        for i in range(count):
+            pool.sendmail("sgnoreply@rit.edu", ["user{}@rit.edu".format(i)], "Subject: Test\r\n\r\nTest")
+        return count / (time.perf_counter() - start)
+
+    # Test messages share one session and compare the rate with a new
+    # session per message.
+    def test_pool_reuses_connection(self):
+        pooled = self.send(self.pool, 100)
+
+        unpooled_pool = SMTPPool("127.0.0.1", self.controller.port, use_tls= False, size= 1)
+        with patch.object(unpooled_pool, "_release", unpooled_pool._close):
+            unpooled = self.send(unpooled_pool, 100)
+
+        assert len(self.recorder.messages) == 200
+        assert self.pool.connections_opened == 1
+        assert unpooled_pool.connections_opened == 100
+        assert pooled > unpooled
+
+    # Test a dropped connection is replaced without losing the message.
+    def test_pool_reconnects(self):
+        self.send(self.pool, 1)
+        server, _ = self.pool._idle.queue[0]
+        server.sock.close()
+
+        self.send(self.pool, 1)
+        assert len(self.recorder.messages) == 2
+        assert self.pool.connections_opened == 2
+
+    # Test a failed retry closes the new connection and raises.
+    def test_pool_retry_fails(self):
+        with patch("smtplib.SMTP.sendmail", side_effect= smtplib.SMTPServerDisconnected()), \
+                patch.object(self.pool, "_close", wraps= self.pool._close) as close:
+            with pytest.raises(smtplib.SMTPServerDisconnected):
+                self.send(self.pool, 1)
+
+        assert close.call_count == 2
+        assert self.pool._idle.empty()
+
+    # Test a refused message is not sent again.
+    def test_pool_refused_not_retried(self):
+        refused = smtplib.SMTPRecipientsRefused({"user0@rit.edu": (550, b"No such user")})
+
+        with patch("smtplib.SMTP.sendmail", side_effect= refused) as sendmail:
+            with pytest.raises(smtplib.SMTPRecipientsRefused):
+                self.send(self.pool, 1)
+
+        assert sendmail.call_count == 1
+        assert self.pool.connections_opened == 1
+        assert self.pool._idle.empty()
+
+    # Test idle connections are checked before they are reused.
+    def test_pool_health_check(self):
+        self.pool.check_after = 0
+        self.send(self.pool, 1)
+        server, _ = self.pool._idle.queue[0]
+        server.close()
+
+        with patch.object(self.pool, "_connect", wraps= self.pool._connect) as connect:
+            self.send(self.pool, 1)
+
+        assert connect.call_count == 1
+        assert len(self.recorder.messages) == 2
+
+    # Test the email task sends through the pool.
+    def test_send_email(self):
+        msg = {
+            "title": "Test",
+            "sender": ("SG TigerTracker", "sgnoreply@rit.edu"),
+            "recipients": ["testuser@rit.edu"],
+            "subtype": "related",
+            "html": "<p>Test</p>"
+        }
+
+        with patch("app.email.controllers.smtp_pool", self.pool):
+            send_email.call_local(msg, 0)
+            send_email.call_local(msg, 0)
+
+        assert len(self.recorder.messages) == 2
+        assert self.recorder.messages[0].rcpt_tos == ["testuser@rit.edu"]
+        assert len(self.recorder.sessions) == 1
+
+    # Test the image parts are read once and attached to every message.
+    def test_build_message_reuses_images(self):
+        msg = {
+            "title": "Test",
+            "sender": ("SG TigerTracker", "sgnoreply@rit.edu"),
+            "recipients": ["testuser@rit.edu"],
+            "subtype": "related",
+            "html": "<p>Test</p>"
+        }
+        first = build_message(msg)
+
+        with patch("builtins.open") as open_file:
+            second = build_message(msg)
+
+        assert not open_file.called
+        assert [p['Content-ID'] for p in second.get_payload()[1:]] == ["<sg-logo>", "<sg-paw>"]
+        assert first.get_payload()[1].get_payload() == second.get_payload()[1].get_payload()
+
+    # Test a digest of one email sends it as it was.
+    def test_digest_single_email(self):
+        pending = {
+            "title": "You're Invited",
+            "sender": ["SG TigerTracker", "sgnoreply@rit.edu"],
+            "recipients": ["testuser@rit.edu"],
+            "subtype": "related",
+            "html": "<p>Invite</p>",
+            "item": {"text": "Invited", "url": "http://test/1", "action": "View Invitation"}
+        }
+        msg = digest_message([pending])
+
+        assert "item" not in msg
+        assert msg["html"] == "<p>Invite</p>"
+
+    # Test pending emails for a recipient are rendered as one message.
+    def test_digest_many_emails(self):
+        pending = [{
+            "title": "Great news, user{} wants to join!".format(i),
+            "sender": ["SG TigerTracker", "sgnoreply@rit.edu"],
+            "recipients": ["testuser@rit.edu"],
+            "subtype": "related",
+            "html": "<p>Request</p>",
+            "item": {"text": "user{} wants to join".format(i), "url": "http://test/{}".format(i), "action": "View Request"}
+        } for i in range(40)]
+        msg = digest_message(pending)
+
+        assert msg["title"] == "40 updates from TigerTracker"
+        assert msg["recipients"] == ["testuser@rit.edu"]
+        assert all("user{} wants to join".format(i) in msg["html"] for i in range(40))
+        assert "http://test/39" in msg["html"]
+
+    # Test emails are sent right away when digest mode is disabled.
+    def test_queue_email_no_window(self):
+        msg = {"recipients": ["testuser@rit.edu"]}
+
+        with patch("config.EMAIL_DIGEST_WINDOW", 0), patch("app.email.controllers.send_email") as send:
+            queue_email(msg, {"text": "Test", "url": "http://test", "action": "View"})
+
+        send.assert_called_once_with(msg)
+
+    # Test emails are stored for the digest instead of being sent when
+    # digest mode is enabled.
+    def test_queue_email_window(self):
+        conn = FakeRedis()
+        msg = {"title": "Test", "recipients": ["testuser@rit.edu", "testuser2@rit.edu"]}
+
+        with patch("config.EMAIL_DIGEST_WINDOW", 600), \
+                patch("app.email.controllers.huey", SimpleNamespace(storage= SimpleNamespace(conn= conn))), \
+                patch("app.email.controllers.send_email") as send:
+            queue_email(msg, {"text": "Test", "url": "http://test", "action": "View"})
+
+        assert not send.called
+        assert len(conn.lists["email_digest:testuser@rit.edu"]) == 1
+        assert sorted(conn.hashes["email_digest:since"]) == [b"testuser2@rit.edu", b"testuser@rit.edu"]
+
+    # Test the queued emails of a recipient are sent as one digest and
+    # removed from the queue.
+    def test_send_digests(self):
+        conn = FakeRedis()
+        storage = SimpleNamespace(storage= SimpleNamespace(conn= conn))
+        msg = {
+            "title": "Test",
+            "sender": ["SG TigerTracker", "sgnoreply@rit.edu"],
+            "recipients": ["testuser@rit.edu"],
+            "subtype": "related",
+            "html": "<p>Test</p>"
+        }
+
+        with patch("config.EMAIL_DIGEST_WINDOW", 600), patch("app.email.controllers.huey", storage):
+            for i in range(3):
+                queue_email(msg, {"text": "Update {}".format(i), "url": "http://test/{}".format(i), "action": "View"})
+
+        with patch("config.EMAIL_DIGEST_WINDOW", 0), patch("app.email.controllers.huey", storage), \
+                patch("app.email.controllers.send_email") as send:
+            send_digests.call_local()
+
+        send.assert_called_once()
+        digest = send.call_args[0][0]
+        assert digest["title"] == "3 updates from TigerTracker"
+        assert digest["recipients"] == ["testuser@rit.edu"]
+        assert all("Update {}".format(i) in digest["html"] for i in range(3))
+        assert conn.lists == {}
+        assert conn.hashes["email_digest:since"] == {}
@@ -7,14 +7,14 @@ created on: 10/12/17
 
 from flask_socketio import emit
 from app.decorators import ensure_dict, get_user
-from app import app, db, socketio
+from app import db, socketio
 from app.users.models import Users
 from app.invitations.models import Invitations
 from app.invitations.invitations_response import Response
-from flask import render_template
+from flask import render_template, current_app
 from sqlalchemy import and_
 from app.email.models import huey
-from app.email.controllers import send_email
+from app.email.controllers import queue_email
 import time
 
 ##
@@ -48,30 +48,83 @@ def send_invite(new_user, committee):
 
         db.session.add(invitation)
         db.session.commit()
+        send_invite_email(invitation)
 
-        email = {}
-        email["title"] = "You're Invited"
-        email["sender"]=("SG TigerTracker", "sgnoreply@rit.edu")
-        email["recipients"] = [new_user + "@rit.edu"]
-        email["subtype"] = "related"
-        email["html"] = render_template(
-            'committee_invitation.html',
-            user_name= new_user,
-            committee_name= committee.title,
-            committee_head= committee.head,
-            time_stamp= time.time(),
-            app_url= app.config['CLIENT_URL'] + str(invitation.id)
-        )
-
-        if not app.config['TESTING']:
-            send_email(email)
-        
         return Response.InviteSent
     except Exception as e:
         db.session.rollback()
         return Response.InviteError
 
 
+##
+## @brief      Adds invitations for several users that don't exist in
+##             ChargeTracker, without committing them.
+##
+## @param      new_users  The ids of the users to be invited.
+## @param      committee  The committee to join.
+##
+## @return     The new invitations, users already invited are skipped.
+##
+def add_invites(new_users, committee):
+    invite = and_(
+        Invitations.user_name.in_(new_users),
+        Invitations.committee_id == committee.id,
+        Invitations.isInvite == True
+    )
+
+    invited = set(i.user_name for i in Invitations.query.filter(invite)) if new_users else set()
+    invitations = []
+
+    for new_user in new_users:
+        if new_user in invited:
+            continue
+
+        invited.add(new_user)
+        invitation = Invitations(
+            user_name= new_user,
+            committee= committee,
+            committee_id = committee.id,
+            charge_id = None,
+            isInvite= True
+        )
+        db.session.add(invitation)
+        invitations.append(invitation)
+
+    return invitations
+
+
+##
+## @brief      Sends the email of a committed invitation.
+##
+## @param      invitation  The invitation.
+##
+## @return     void
+##
+def send_invite_email(invitation):
+    committee = invitation.committee
+    email_url = current_app.config['CLIENT_URL'] + str(invitation.id)
+    email = {}
+    email["title"] = "You're Invited"
+    email["sender"]=("SG TigerTracker", "sgnoreply@rit.edu")
+    email["recipients"] = [invitation.user_name + "@rit.edu"]
+    email["subtype"] = "related"
+    email["html"] = render_template(
+        'committee_invitation.html',
+        user_name= invitation.user_name,
+        committee_name= committee.title,
+        committee_head= committee.head,
+        time_stamp= time.time(),
+        app_url= email_url
+    )
+
+    if not current_app.config['TESTING']:
+        queue_email(email, {
+            "text": "You have been invited to join " + committee.title + ".",
+            "url": email_url,
+            "action": "View Invitation"
+        })
+
+
 ##
 ## @brief      Sends a request email to join a committee
 ##             to the committee head.
@@ -102,6 +155,7 @@ def send_request(new_user, committee):
     try:
         db.session.add(invitation)
         db.session.commit()
+        email_url = current_app.config['CLIENT_URL'] + str(invitation.id)
         email = {}
         email["title"] = "Great news, " + new_user.id + " wants to join!"
         email["sender"] = ("SG TigerTracker", "sgnoreply@rit.edu")
@@ -113,11 +167,15 @@ def send_request(new_user, committee):
             committee_head= committee.head,
             committee_name= committee.title,
             time_stamp= time.time(),
-            request_url= app.config['CLIENT_URL'] + str(invitation.id)
+            request_url= email_url
         )
 
-        if not app.config['TESTING']:
-            send_email(email)
+        if not current_app.config['TESTING']:
+            queue_email(email, {
+                "text": new_user.id + " wants to join " + committee.title + ".",
+                "url": email_url,
+                "action": "View Request"
+            })
 
         return Response.RequestSent
     except Exception as e:
@@ -135,11 +193,7 @@ def send_request(new_user, committee):
 ##
 def send_close_request(user, committee, chargeID):
     
-    admins = db.session.query(Users).filter(Users.is_admin == True).all()
-
-    admin_emails = []
-    for user in admins:
-        admin_emails.append(user.id + "@rit.edu")
+    admin_emails = [admin + "@rit.edu" for admin in Users.admin_ids()]
 
     invite = and_(
         Invitations.user_name == committee.head,
@@ -158,6 +212,7 @@ def send_close_request(user, committee, chargeID):
     try:
         db.session.add(invitation)
         db.session.commit()
+        email_url = current_app.config['CLIENT_URL'] + str(invitation.id)
         email = {}
         email["title"] = "Close Charge Request"
         email["sender"]=("SG TigerTracker", "sgnoreply@rit.edu")
@@ -168,10 +223,14 @@ def send_close_request(user, committee, chargeID):
             user_name= committee.head,
             charge_name= chargeID,
             time_stamp= time.time(),
-            request_url= app.config['CLIENT_URL'] + str(invitation.id)
+            request_url= email_url
         )
-        if not app.config['TESTING']:
-            send_email(email)
+        if not current_app.config['TESTING']:
+            queue_email(email, {
+                "text": committee.head + " has requested to close charge " + str(chargeID) + ".",
+                "url": email_url,
+                "action": "View Request"
+            })
         
         return Response.RequestSent
     except Exception as e:
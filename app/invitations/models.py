@@ -12,8 +12,8 @@ from app.charges.models import Charges
 class Invitations(db.Model):
 	__tablename__ = 'invitations'
 	id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-	user_name = db.Column(db.String(255))
-	committee_id = db.Column(db.ForeignKey('committees.id'))
+	user_name = db.Column(db.String(255), index= True)
+	committee_id = db.Column(db.ForeignKey('committees.id'), index= True)
 	committee = db.relationship(Committees)
 	charge_id = db.Column(db.Integer)
 	isInvite = db.Column(db.Boolean)
@@ -8,14 +8,15 @@ created on: 10/19/17
 import pytest
 import config
 from app.invitations.models import Invitations
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from app.users.models import Users
 from mock import patch, MagicMock
 from app.committees.models import Committees
 from app.invitations.invitations_response import Response
 from app.notifications.controllers import new_request, new_committee
-from flask_sqlalchemy import SQLAlchemy
 
+app = create_app('config_testing')
 
 
 class TestInvitations(object):
@@ -26,7 +27,8 @@ class TestInvitations(object):
 
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -38,6 +40,7 @@ class TestInvitations(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
         self.user_data = {"user_id": "testuser",
                           "committee_id": "testcommittee"}
 
@@ -99,6 +102,7 @@ class TestInvitations(object):
         db.session.close()
         db.drop_all()
         self.socketio.disconnect()
+        self.context.pop()
 
 
     # Test sending a request to join a committee.
@@ -12,23 +12,33 @@ from app.committees.models import Committees
 from app.users.models import Users
 from app.members.models import Members, Roles
 from app.members.members_response import Response
-from app.invitations.controllers import send_invite, send_request
+from app.invitations.controllers import send_invite, send_request, add_invites, send_invite_email
+from app.rooms import committee_room, join_committee_view, leave_committee_members
+from app.authorization import forget_memberships
+from collections import OrderedDict
 
 
 ##
 ## @brief      Gets the committee members for a specific committee.
 ##
 ## @param      committee_id  The id for the committee.
+## @param      room          Room to send the members to, if not
+##                           defined they are sent to the client,
+##                           which joins the committee's room.
 ##
 ## @emit       Array with committee members.
 ##
 @socketio.on('get_members')
-def get_committee_members(committee_id, broadcast= False):
+def get_committee_members(committee_id, room= None):
 
     committee = Committees.query.filter_by(id= committee_id).first()
 
     if committee is not None:
-        members = committee.members
+        if room is None:
+            join_committee_view(committee.id)
+
+        # Loads the users with their memberships in one statement.
+        members = committee.members.options(db.joinedload(Members.member)).all()
         mem_arr = [
             {
                 "id": m.member.id,
@@ -38,7 +48,7 @@ def get_committee_members(committee_id, broadcast= False):
             for m in members
         ]
         mem_data = {"committee_id": committee.id, "members": mem_arr}
-        emit("get_members", mem_data, broadcast= broadcast)
+        emit("get_members", mem_data, room= room)
     else:
         emit("get_members", Response.ComDoesntExist)
 
@@ -92,14 +102,96 @@ def add_to_committee(user, user_data):
         membership.member = new_user
         committee.members.append(membership)
         db.session.commit()
+        forget_memberships(new_user.id)
 
-        get_committee_members(committee.id, broadcast = True)
+        get_committee_members(committee.id, room = committee_room(committee.id))
         emit("add_member_committee", Response.AddSuccess)
     except Exception as e:
         db.session.rollback()
         emit("add_member_committee", Response.AddError)
 
 
+##
+## @brief      Adds several members to a committee at once.
+##
+##             Existing users are looked up in one query and users that
+##             don't exist in the app are invited. Everything is committed
+##             together and the member list is sent to the committee once.
+##
+## @param      user_data  Contains the data needed to add the members:
+##
+##                        - committee_id (required): Id of committee.
+##                        - members (required): Array of dicts with:
+##                            - user_id (required): Id of user to be added.
+##                            - role (optional): Role of Member, if not
+##                              defined it will be set to NormalMember.
+##
+##                        Any other parameters will be ignored.
+##
+## @emit       Success with the ids of the users that were added and
+##             invited, error if the members couldn't be added.
+##
+@socketio.on('add_members_committee')
+@ensure_dict
+@get_user
+def add_members_to_committee(user, user_data):
+
+    committee = Committees.query.filter_by(id= user_data.get("committee_id",-1)).first()
+
+    if committee is None or user is None:
+        emit("add_members_committee", Response.UserDoesntExist)
+        return;
+
+    if committee.head != user.id and not user.is_admin:
+        emit("add_members_committee", Response.AddPermError)
+        return;
+
+    try:
+        roles = OrderedDict(
+            (m["user_id"], Roles[m.get("role", Roles.NormalMember.value)])
+            for m in user_data.get("members", [])
+        )
+    except (KeyError, TypeError, AttributeError):
+        emit("add_members_committee", Response.RoleDoesntExist)
+        return;
+
+    user_ids = list(roles)
+    users = Users.query.filter(Users.id.in_(user_ids)).all() if user_ids else []
+    members = committee.members.filter(Members.users_id.in_(user_ids)) if user_ids else []
+    current = set(m.users_id for m in members)
+    found = set(u.id for u in users)
+    added = []
+
+    try:
+        for new_user in users:
+            if new_user.id in current:
+                continue
+
+            membership = Members(role= roles[new_user.id])
+            membership.member = new_user
+            committee.members.append(membership)
+            added.append(new_user.id)
+
+        invitations = add_invites([i for i in user_ids if i not in found], committee)
+        db.session.commit()
+        forget_memberships(*added)
+    except Exception as e:
+        db.session.rollback()
+        emit("add_members_committee", Response.AddError)
+        return;
+
+    for invitation in invitations:
+        send_invite_email(invitation)
+
+    if added:
+        get_committee_members(committee.id, room = committee_room(committee.id))
+
+    emit("add_members_committee", dict(Response.AddMembersSuccess,
+        added= added,
+        invited= [i.user_name for i in invitations]
+    ))
+
+
 ##
 ## @brief      Removes a member from a committee.
 ##
@@ -137,7 +229,9 @@ def remove_from_committee(user, user_data):
         membership = committee.members.filter_by(member= delete_user).first()
         db.session.delete(membership)
         db.session.commit()
-        get_committee_members(committee.id, broadcast = True)
+        forget_memberships(delete_user.id)
+        leave_committee_members(delete_user.id, committee.id)
+        get_committee_members(committee.id, room = committee_room(committee.id))
         emit("remove_member_committee", Response.RemoveSuccess)
     except Exception as e:
         db.session.rollback()
@@ -182,6 +276,7 @@ def edit_member_role(user, user_data):
         membership = committee.members.filter_by(member= modify_user).first()
         membership.role = role
         db.session.commit()
+        forget_memberships(modify_user.id)
         emit("edit_role_member_committee", Response.EditSuccess)
     except Exception as e:
         db.session.rollback()
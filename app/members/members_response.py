@@ -9,6 +9,8 @@ class Response():
 	ComDoesntExist = {"error": "Committee doesn't exist."}
 	AddSuccess = {"success": "User has been added to committee."}
 	AddError = {"error": "User couldn't be added to committee."}
+	AddMembersSuccess = {"success": "Users have been added to committee."}
+	AddPermError = {"error": "User doesn't have permissions to add members."}
 	RequestSent = {"success": "Request to join has been sent."}
 	UserDoesntExist = {"error": "User or committee don't exist."}
 	RemoveSuccess = {"success": "Member has been removed from committee."}
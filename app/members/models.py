@@ -20,7 +20,7 @@ class Roles(Enum):
 class Members(db.Model):
 	__tablename__ = 'members'
 	committees_id = db.Column(db.String(255), db.ForeignKey('committees.id'), primary_key=True)
-	users_id = db.Column(db.String(255), db.ForeignKey('users.id'), primary_key=True)
+	users_id = db.Column(db.String(255), db.ForeignKey('users.id'), primary_key=True, index= True)
 	role = db.Column(ChoiceType(Roles, impl=db.String()))
 	member = db.relationship('Users', backref= db.backref('committees', lazy='dynamic'))
 	committee = db.relationship('Committees', backref= db.backref('members', lazy='dynamic'))
@@ -7,7 +7,8 @@ created on: 10/05/17
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache, committee_roles, committee_role
 from mock import patch, MagicMock
 from app.users.models import Users
 from app.members.models import Members, Roles
@@ -15,8 +16,11 @@ from app.committees.models import Committees
 from flask_socketio import SocketIOTestClient
 from app.members.members_response import Response
 from app.notifications.controllers import new_committee
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import create_engine
+from app.query_counter import QueryCounter
+from app.rooms import committee_members_room
+
+app = create_app('config_testing')
 
 
 class TestMembers(object):
@@ -27,7 +31,8 @@ class TestMembers(object):
 
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -40,6 +45,7 @@ class TestMembers(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         self.user_data = {
             "user_id": "testuser",
@@ -115,6 +121,7 @@ class TestMembers(object):
         db.drop_all()
         db.event.listen(Committees, "after_insert", new_committee)
         self.socketio.disconnect()
+        self.context.pop()
 
 
     # Test get members of nonexistent committee.
@@ -140,8 +147,28 @@ class TestMembers(object):
         assert (commitee["members"] == [result])
 
 
+    # Test the members of a large committee are loaded in two statements.
+    def test_get_committee_members_statements(self):
+        for i in range(200):
+            membership = Members(role= Roles.NormalMember)
+            membership.member = Users(id = "member{}".format(i), first_name = "Member", last_name = str(i),
+                email = "member{}@test.com".format(i), is_admin = False)
+            self.committee.members.append(membership)
+        db.session.commit()
+        db.session.expire_all()
+
+        with QueryCounter() as counter:
+            self.socketio.emit("get_members", "testcommittee")
+
+        received = self.socketio.get_received()
+        assert len(received[0]["args"][0]["members"]) == 201
+        assert counter.count == 2
+
+
     # Test add to committee when admin.
     def test_add_to_committee(self):
+        self.socketio.emit("get_members", "testcommittee")
+        self.socketio.get_received()
         self.user_data["token"] = self.admin_token
         self.socketio.emit("add_member_committee", self.user_data)
         received = self.socketio.get_received()
@@ -151,6 +178,8 @@ class TestMembers(object):
 
     # Test add user to more than one committee.
     def test_add_to_second_committee(self):
+        self.socketio.emit("get_members", "testcommittee2")
+        self.socketio.get_received()
         self.user_data["token"] = self.admin_token
         self.user_data["committee_id"] = "testcommittee2"
         self.user_data["user_id"] = "test2user"
@@ -163,6 +192,8 @@ class TestMembers(object):
     # Test add to committee when admin and
     # no role specified.
     def test_add_to_committee_no_role(self):
+        self.socketio.emit("get_members", "testcommittee")
+        self.socketio.get_received()
         self.user_data["token"] = self.admin_token
         del self.user_data["role"]
         self.socketio.emit("add_member_committee", self.user_data)
@@ -191,6 +222,59 @@ class TestMembers(object):
         assert received[0]["args"][0] == Response.AddError
 
 
+    # Test adding several members commits once and sends the list once.
+    def test_add_members_committee(self):
+        for i in range(60):
+            db.session.add(Users(id = "bulkuser{}".format(i), first_name = "Bulk", last_name = "User",
+                email = "bulkuser{}@test.com".format(i), is_admin = False))
+        db.session.commit()
+
+        user_data = {
+            "token": self.admin_token,
+            "committee_id": "testcommittee",
+            "members": [{"user_id": "bulkuser{}".format(i)} for i in range(60)] +
+                [{"user_id": "test2user"}, {"user_id": "newuser", "role": "ActiveMember"}]
+        }
+
+        with patch.object(db.session, "commit", wraps= db.session.commit) as commit:
+            self.socketio.emit("add_members_committee", user_data)
+
+        received = self.socketio.get_received()
+        members = [r for r in received if r["name"] == "get_members"]
+        result = received[-1]["args"][0]
+
+        assert commit.call_count == 1
+        assert len(members) == 1
+        assert len(members[0]["args"][0]["members"]) == 61
+        assert result["success"] == Response.AddMembersSuccess["success"]
+        assert result["added"] == ["bulkuser{}".format(i) for i in range(60)]
+        assert result["invited"] == ["newuser"]
+
+
+    # Test adding several members when not head or admin.
+    def test_add_members_committee_noperms(self):
+        user_data = {
+            "token": self.user_token,
+            "committee_id": "testcommittee",
+            "members": [{"user_id": "testuser"}]
+        }
+        self.socketio.emit("add_members_committee", user_data)
+        received = self.socketio.get_received()
+        assert received[0]["args"][0] == Response.AddPermError
+
+
+    # Test adding several members with a role that doesn't exist.
+    def test_add_members_committee_nonrole(self):
+        user_data = {
+            "token": self.admin_token,
+            "committee_id": "testcommittee",
+            "members": [{"user_id": "testuser", "role": "nonexistent"}]
+        }
+        self.socketio.emit("add_members_committee", user_data)
+        received = self.socketio.get_received()
+        assert received[0]["args"][0] == Response.RoleDoesntExist
+
+
     # Test trying to remove not admin.
     def test_remove_member_notadmin(self):
         self.user_data["token"] = self.user_token
@@ -201,6 +285,8 @@ class TestMembers(object):
 
     # Test remove member admin
     def test_remove_member_admin(self):
+        self.socketio.emit("get_members", "testcommittee")
+        self.socketio.get_received()
         self.user_data["token"] = self.admin_token
         self.user_data["user_id"] = self.user2.id
         self.socketio.emit("remove_member_committee", self.user_data)
@@ -208,6 +294,21 @@ class TestMembers(object):
         assert received[0]["args"][0]["members"] == [] 
         assert received[1]["args"][0] == Response.RemoveSuccess
     
+    # Test a removed member stops getting private charge changes.
+    def test_remove_member_leaves_members_room(self):
+        client = socketio.test_client(app)
+        client.emit("get_charges", {"token": self.user2_token, "committee_id": "testcommittee"})
+        client.get_received()
+        assert committee_members_room("testcommittee") in socketio.server.rooms(client.sid)
+
+        self.user_data["token"] = self.admin_token
+        self.user_data["user_id"] = self.user2.id
+        client.emit("remove_member_committee", self.user_data)
+        client.get_received()
+
+        assert committee_members_room("testcommittee") not in socketio.server.rooms(client.sid)
+        client.disconnect()
+
     # Test remove committee head should fail.
     def test_remove_head_admin(self):
         self.user_data["token"] = self.admin_token
@@ -265,6 +366,24 @@ class TestMembers(object):
         assert received[0]["args"][0] == Response.EditSuccess
 
 
+    # Test roles are cached and dropped when a member's role changes.
+    def test_committee_roles_cache(self):
+        assert committee_roles(self.user2.id) == {"testcommittee": Roles.NormalMember}
+
+        with QueryCounter() as counter:
+            assert committee_role(self.user2, "testcommittee") == Roles.NormalMember
+            assert committee_role(self.user2, "testcommittee2") is None
+        assert counter.count == 0
+
+        self.user_data["token"] = self.admin_token
+        self.user_data["user_id"] = self.user2.id
+        self.user_data["role"] = Roles.ActiveMember.value
+        self.socketio.emit("edit_role_member_committee", self.user_data)
+        self.socketio.get_received()
+
+        assert committee_role(self.user2, "testcommittee") == Roles.ActiveMember
+
+
     # Test remove nonexistent member.
     def test_edit_member_nonexistent(self):
         self.user_data["token"] = self.admin_token
@@ -0,0 +1,158 @@
+"""
+filename: metrics.py
+description: Latency and database metrics of the socket handlers.
+created on: 10/18/26
+"""
+
+import functools
+import threading
+import time
+from flask_socketio import SocketIO
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.local import Local
+
+
+# Upper bounds of the histogram buckets.
+SECONDS_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+STATEMENT_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100, 200]
+
+
+##
+## @brief      Prometheus histogram with one series per event name.
+##
+class Histogram():
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, event, value):
+        counts, total = self.series.get(event, ([0] * (len(self.buckets) + 1), 0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.series[event] = (counts, total + value)
+
+    def render(self):
+        lines = ["# HELP {} {}".format(self.name, self.help), "# TYPE {} histogram".format(self.name)]
+
+        for event, (counts, total) in sorted(self.series.items()):
+            label = 'event="{}"'.format(escape(event))
+            for bound, count in zip(self.buckets + ["+Inf"], counts):
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(self.name, label, bound, count))
+            lines.append("{}_sum{{{}}} {}".format(self.name, label, total))
+            lines.append("{}_count{{{}}} {}".format(self.name, label, counts[-1]))
+        return lines
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+##
+## @brief      The metrics of this process.
+##
+class Metrics():
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.duration = Histogram("socketio_event_duration_seconds",
+                "Time spent handling a Socket.IO event.", SECONDS_BUCKETS)
+            self.statements = Histogram("socketio_event_db_statements",
+                "SQL statements executed while handling a Socket.IO event.", STATEMENT_BUCKETS)
+            self.db_duration = Histogram("socketio_event_db_duration_seconds",
+                "Time spent in SQL statements while handling a Socket.IO event.", SECONDS_BUCKETS)
+            self.errors = {}
+
+    def observe(self, event, seconds, statements, db_seconds, failed):
+        with self.lock:
+            self.duration.observe(event, seconds)
+            self.statements.observe(event, statements)
+            self.db_duration.observe(event, db_seconds)
+            if failed:
+                self.errors[event] = self.errors.get(event, 0) + 1
+
+    ## Renders the metrics in the Prometheus text format.
+    def render(self):
+        with self.lock:
+            lines = self.duration.render() + self.statements.render() + self.db_duration.render()
+            lines += [
+                "# HELP socketio_event_errors_total Socket.IO events whose handler raised an exception.",
+                "# TYPE socketio_event_errors_total counter"
+            ]
+            lines += ['socketio_event_errors_total{{event="{}"}} {}'.format(escape(e), c)
+                      for e, c in sorted(self.errors.items())]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# Statements of the event handled by the current thread or greenlet.
+tracking = Local()
+
+
+# The start time is kept on the execution context, a statement that
+# raises never reaches after_cursor_execute and is dropped with it.
+@event.listens_for(Engine, "before_cursor_execute")
+def statement_started(conn, cursor, statement, parameters, context, executemany):
+    if getattr(tracking, "statements", None) is not None and context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_start", None)
+    if getattr(tracking, "statements", None) is not None and started is not None:
+        tracking.statements += 1
+        tracking.db_seconds += time.perf_counter() - started
+
+
+##
+## @brief      Wraps a socket handler to record its metrics.
+##
+## @param      name     The event name.
+## @param      handler  The handler.
+##
+## @return     The wrapped handler.
+##
+def instrument(name, handler):
+    @functools.wraps(handler)
+    def wrapped(*args, **kwargs):
+        tracking.statements, tracking.db_seconds = 0, 0.0
+        failed = True
+        start = time.perf_counter()
+
+        try:
+            result = handler(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            metrics.observe(name, time.perf_counter() - start, tracking.statements, tracking.db_seconds, failed)
+            tracking.statements = None
+    return wrapped
+
+
+##
+## @brief      SocketIO that records the metrics of every handler
+##             registered with @socketio.on.
+##
+##             The decorator still returns the handler itself, so calls
+##             between controllers are not counted as events.
+##
+class InstrumentedSocketIO(SocketIO):
+
+    def on(self, message, namespace = None):
+        register = super(InstrumentedSocketIO, self).on(message, namespace)
+
+        def decorator(handler):
+            register(instrument(message, handler))
+            return handler
+        return decorator
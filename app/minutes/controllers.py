@@ -9,11 +9,25 @@ from flask_socketio import emit
 from app.decorators import ensure_dict, get_user
 from app import socketio, db
 from app.committees.models import Committees
+from app.authorization import is_member
 from app.members.models import Roles
 from app.minutes.models import Minutes
 from app.charges.models import Charges
 from app.minutes.minutes_response import Response
 from app.users.models import Users
+from app.pagination import wants_page, paginate
+
+
+def serialize_minute(minute):
+    return {
+        'id': minute.id,
+        'title': minute.title,
+        'body': minute.body,
+        'date': minute.date,
+        'private': minute.private,
+        'committee_id': minute.committee_id,
+        'charges': [{"id": c.id, "title": c.title} for c in minute.charges]
+    }
 
 
 ##
@@ -38,23 +52,12 @@ def get_minute(user, user_data):
     
     committee = minute.committee 
 
-    membership = committee.members.filter_by(member = user).first()
-
     if minute.private:
-        if user is None or (membership is None and not user.is_admin):
+        if user is None or (not is_member(user, committee.id) and not user.is_admin):
             emit('get_minute', Response.PermError)
             return
     
-    minute_data = {
-        'id': minute.id,
-        'title': minute.title,
-        'body': minute.body,
-        'date': minute.date,
-        'private': minute.private,
-        'committee_id': minute.committee_id,
-        'charges': [{"id": c.id, "title": c.title} for c in minute.charges]
-    }
-    emit('get_minute', minute_data)
+    emit('get_minute', serialize_minute(minute))
 
 
 ##
@@ -64,8 +67,9 @@ def get_minute(user, user_data):
 ## @param      user_data    Contains the following keys:
 ##             
 ##             - committee_id (Integer)   the id of the committee.
+##             - limit, cursor (Optional) get a page, newest first.
 ##
-## @emit       Emits a list of minutes
+## @emit       Emits a list of minutes, or a page of them
 ##
 @socketio.on('get_minutes')
 @ensure_dict
@@ -77,27 +81,21 @@ def get_minutes(user, user_data):
         emit('get_minutes', Response.CommitteeDoesntExist)
         return
     
-    # Get the members role.
-    membership = committee.members.filter_by(member= user).first()
     minutes = None
 
-    if user is None or (membership is None and not user.is_admin):
-        minutes = committee.minutes.filter_by(private= False).all()
+    if user is None or (not is_member(user, committee.id) and not user.is_admin):
+        minutes = committee.minutes.filter_by(private= False)
     else:
-        minutes = committee.minutes.all()
-    
-    minute_data = []
-    
-    for minute in minutes:
-        minute_data.append({
-            'id': minute.id,
-            'title': minute.title,
-            'body': minute.body,
-            'private': minute.private,
-            'date': minute.date,
-            'committee_id': minute.committee_id,
-            'charges': [{"id": c.id, "title": c.title} for c in minute.charges]
-        })
+        minutes = committee.minutes
+
+    # Load the charges of every minute in one more query.
+    minutes = minutes.options(db.selectinload(Minutes.charges))
+
+    if wants_page(user_data):
+        emit('get_minutes', paginate(minutes, [Minutes.id], user_data, serialize_minute))
+        return
+
+    minute_data = [serialize_minute(minute) for minute in minutes.all()]
     emit('get_minutes', minute_data)
 
 
@@ -136,10 +134,7 @@ def create_minute(user, user_data):
         emit('create_minute', Response.AddMinuteError)
         return
 
-    # Get the members role.
-    membership = committee.members.filter_by(member= user).first()
-
-    if membership is None and not user.is_admin:
+    if not is_member(user, committee.id) and not user.is_admin:
         emit('create_minute', Response.PermError)
         return
     
@@ -231,9 +226,7 @@ def edit_minute(user, user_data):
     
     committee = minute.committee 
 
-    membership = committee.members.filter_by(member= user).first()
-
-    if membership is None and not user.is_admin:
+    if not is_member(user, committee.id) and not user.is_admin:
         emit('edit_minute', Response.PermError)
         return
     
@@ -18,7 +18,7 @@ class Minutes(db.Model):
 	body  = db.Column(db.String)
 	date = db.Column(db.BigInteger) # EPOCH datetime.
 	private = db.Column(db.Boolean)
-	committee_id = db.Column(db.String, db.ForeignKey('committees.id'))
+	committee_id = db.Column(db.String, db.ForeignKey('committees.id'), index= True)
 	committee = db.relationship("Committees", backref= db.backref('minutes', lazy='dynamic'))
 	charges = db.relationship("Charges", secondary=relevant_charges)
 
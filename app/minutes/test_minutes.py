@@ -7,7 +7,8 @@ created on: 02/13/19
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from mock import patch, MagicMock
 from app.users.models import Users
 from app.members.models import Members, Roles
@@ -18,9 +19,10 @@ from app.minutes.minutes_response import Response
 from app.minutes.models import Minutes
 from app.charges.models import Charges
 from app.notifications.controllers import new_committee
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import create_engine
 
+app = create_app('config_testing')
+
 
 class TestMinutes(object):
 
@@ -29,7 +31,8 @@ class TestMinutes(object):
         self.app = app.test_client()
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -41,6 +44,7 @@ class TestMinutes(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         # Create admin user for tests.
         admin = Users(id = "adminuser")
@@ -155,6 +159,7 @@ class TestMinutes(object):
         db.drop_all()
         db.event.listen(Committees, "after_insert", new_committee)
         self.socketio.disconnect()
+        self.context.pop()
     
     def test_get_minutes_no_user(self):
         self.user_data["token"] = ""
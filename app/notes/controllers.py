@@ -10,10 +10,36 @@ from app.decorators import ensure_dict, get_user
 from app import socketio, db
 from app.actions.models import *
 from app.committees.models import *
+from app.authorization import is_member
 from app.charges.models import *
 from app.notes.models import *
 from app.users.models import Users
 from app.notes.notes_response import Response
+from app.rooms import charge_room
+from app.pagination import wants_page, paginate
+
+
+##
+## @brief      Serializes a note for the note events.
+##
+##             The list is sent once by get_notes, later changes are
+##             sent to the room of the action's charge as 'note_added'
+##             and 'note_updated' events carrying a single note.
+##
+## @param      note  The note object.
+##
+## @return     Dictionary with the note data.
+##
+def serialize_note(note):
+    return {
+        "id": note.id,
+        "author": "{} {}".format(note.author_user.first_name, note.author_user.last_name),
+        "action": note.action,
+        "description": note.description,
+        "status": note.status,
+        "created_at": note.created_at.isoformat(),
+        "hidden": note.hidden
+    }
 
 ##
 ## @brief      Creates a note. (Must be admin user or committe head or assigned to action)
@@ -44,7 +70,7 @@ def create_note(user, user_data):
 
     if (not user.is_admin and 
         committee.head != user.id and 
-        committee not in user.committees):
+        not is_member(user, committee.id)):
         emit("create_note", Response.UsrNotAuth)
         return;
 
@@ -59,7 +85,7 @@ def create_note(user, user_data):
     try:
         db.session.commit()
         emit('create_note', Response.AddSuccess)
-        get_notes(action.id, broadcast = True)
+        emit('note_added', serialize_note(note), room = charge_room(action.charge))
     except Exception as e:
         db.session.rollback()
         db.session.flush()
@@ -69,24 +95,25 @@ def create_note(user, user_data):
 ##
 ## @brief      Gets notes from an action
 ##
-## @param      action_id    - id of the action
+## @param      action_id    - id of the action, or a dict with
+##                            "action_id", "limit" and "cursor" to
+##                            get a page.
 ##
 @socketio.on('get_notes')
 def get_notes(action_id, broadcast = False):
-    notes = Notes.query.filter_by(action= action_id).all()
-    note_ser = [
-                    {
-                        "id": c.id,
-                        "author": "{} {}".format(Users.query.filter_by(id = c.author).first().first_name, Users.query.filter_by(id = c.author).first().last_name),
-                        "action": c.action,
-                        "description": c.description,
-                        "status": c.status,
-                        "action": c.action,
-                        "created_at": c.created_at.isoformat(),
-                        "hidden": c.hidden
-                    }
-                    for c in notes
-                ]
+    page = action_id if type(action_id) is dict else None
+
+    if page is not None:
+        action_id = page.get("action_id")
+
+    # Load the authors in the same query to avoid one lookup per note.
+    query = Notes.query.options(db.joinedload(Notes.author_user)).filter_by(action= action_id)
+
+    if page is not None and wants_page(page):
+        emit("get_notes", paginate(query, [Notes.created_at, Notes.id], page, serialize_note))
+        return
+
+    note_ser = [serialize_note(c) for c in query.all()]
     emit("get_notes", note_ser, broadcast = broadcast)
 
 ##
@@ -97,11 +124,12 @@ def get_notes(action_id, broadcast = False):
 @socketio.on('get_note')
 def get_note(id, broadcast = False):
 
-    note = Notes.query.filter_by(id= id).first()
+    note = Notes.query.options(db.joinedload(Notes.author_user)).filter_by(id= id).first()
     if note is not None:
         note_data = {
             "id": note.id,
             "author": note.author,
+            "author_name": "{} {}".format(note.author_user.first_name, note.author_user.last_name),
             "action": note.action,
             "description": note.description,
             "created_at": note.created_at,
@@ -159,7 +187,7 @@ def modify_note(user, user_data):
         try:
             db.session.commit()
             emit('modify_note', Response.ModifySuccess)
-            get_note(note.id, broadcast = True)
+            emit('note_updated', serialize_note(note), room = charge_room(action.charge))
         except Exception as e:
             db.session.rollback()
             db.session.flush()
@@ -13,6 +13,7 @@ class Notes(db.Model):
 	description = db.Column(db.String)
 	status = db.Column(db.Integer)
 	author = db.Column(db.ForeignKey('users.id'))
-	action = db.Column(db.ForeignKey('actions.id'))
+	author_user = db.relationship('Users', foreign_keys= [author])
+	action = db.Column(db.ForeignKey('actions.id'), index= True)
 	created_at = db.Column(db.DateTime, server_default= db.func.now())
 	hidden = db.Column(db.Boolean)
@@ -8,7 +8,8 @@ created on: 04/04/18
 import pytest
 import config
 from mock import patch, MagicMock
-from app import app, db, socketio
+from app import create_app, db, socketio
+from app.authorization import membership_cache
 from app.notes.notes_response import Response
 from app.committees.models import Committees
 from app.users.permissions import Permissions
@@ -17,8 +18,11 @@ from app.charges.models import *
 from app.notes.models import *
 from app.notifications.controllers import new_action, new_committee
 from app.users.models import Users
+from app.members.models import Members, Roles
+from app.query_counter import QueryCounter
 from flask_socketio import SocketIOTestClient
-from flask_sqlalchemy import SQLAlchemy
+
+app = create_app('config_testing')
 
 
 class TestNotes(object):
@@ -28,7 +32,8 @@ class TestNotes(object):
         self.app = app.test_client()
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -44,11 +49,13 @@ class TestNotes(object):
         db.session.close()
         db.drop_all()
         self.socketio.disconnect()
+        self.context.pop()
 
     @classmethod
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        membership_cache.clear()
 
         # Create admin user for tests.
         admin = Users(id = "adminuser")
@@ -140,6 +147,21 @@ class TestNotes(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.AddSuccess
 
+    # Test creating a note sends only the new note to the charge room.
+    def test_create_note_delta(self):
+        self.socketio.emit('get_actions', 10)
+        self.socketio.get_received()
+
+        user_data = {"token": self.admin_token,
+                     "action": 10,
+                     "description": "New Description"}
+
+        self.socketio.emit('create_note', user_data)
+        received = self.socketio.get_received()
+        assert received[1]["name"] == "note_added"
+        assert received[1]["args"][0]["author"] == "Admin User"
+        assert received[1]["args"][0]["description"] == "New Description"
+
     # Test creating note raises an Exception.
     @patch('flask_sqlalchemy._QueryProperty.__get__')
     def test_create_note_exception(self, mock_obj):
@@ -193,6 +215,21 @@ class TestNotes(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.UsrNotAuth
 
+    # Test when a note is created by a committee member
+    def test_create_note_member(self):
+        membership = Members(role= Roles.NormalMember)
+        membership.member = self.test_user2
+        Committees.query.get("testcommittee").members.append(membership)
+        db.session.commit()
+
+        user_data = {"token": self.user_token2,
+                     "action": 10,
+                     "description": "New Description"}
+
+        self.socketio.emit('create_note', user_data)
+        received = self.socketio.get_received()
+        assert received[0]["args"][0] == Response.AddSuccess
+
     def test_get_note(self):
         self.socketio.emit('get_note', '10')
 
@@ -209,6 +246,44 @@ class TestNotes(object):
         assert received[0]["args"][0][0]["action"] == 10
         assert received[0]["args"][0][0]["description"] == "Test Note"
 
+    def test_get_notes_paginated(self):
+        self.socketio.emit('get_notes', {"action_id": 10, "limit": 1})
+
+        page = self.socketio.get_received()[0]["args"][0]
+        assert len(page["items"]) == 1
+        assert page["items"][0]["description"] == "Test Note"
+        assert page["next_cursor"] is None
+
+    def test_get_notes_query_count(self):
+        with QueryCounter() as counter:
+            self.socketio.emit('get_notes', '10')
+        self.socketio.get_received()
+        single_count = counter.count
+
+        for count in range(50):
+            note = Notes(id = 100 + count)
+            note.author = "testuser2" if count % 2 else "adminuser"
+            note.description = "Test Note " + str(count)
+            note.action = 10
+            note.hidden = False
+            db.session.add(note)
+        db.session.commit()
+
+        with QueryCounter() as counter:
+            self.socketio.emit('get_notes', '10')
+        received = self.socketio.get_received()
+
+        assert len(received[0]["args"][0]) == 51
+        assert counter.count == single_count
+
+    def test_get_note_author_name(self):
+        with QueryCounter() as counter:
+            self.socketio.emit('get_note', '10')
+        received = self.socketio.get_received()
+
+        assert received[0]["args"][0]["author_name"] == 'Test1 User'
+        assert counter.count == 1
+
     def test_get_note_empty(self):
         self.socketio.emit('get_note', '99')
 
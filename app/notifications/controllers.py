@@ -13,19 +13,35 @@ from app.committees.models import Committees
 from app.invitations.models import Invitations
 from app.notifications.models import Notifications, NotificationType
 from app.decorators import ensure_dict, get_user
+from app.pagination import wants_page, paginate
+from app.email.models import huey
 from app import db, socketio
-from flask_socketio import emit
+from flask import current_app, has_app_context
+from flask_socketio import emit, SocketIO
+from sqlalchemy import select
+from sqlalchemy.orm import object_session
+from collections import OrderedDict
 import re
 
-notifications_table = Notifications.__table__.insert() 
+
+def serialize_notification(notification):
+    return {
+        "id": notification.id,
+        "user": notification.user,
+        "type": notification.type.value,
+        "destination": notification.destination,
+        "message": notification.message,
+        "redirect": notification.redirect
+    }
 
 ##
 ## @brief      Gets the notifications for a user.
 ##
 ## @param      user       The user object.
-## @param      user_data  The user data.
+## @param      user_data  The user data, may contain "limit" and
+##                        "cursor" to get a page, newest first.
 ##
-## @return     An array of notifications for the user.
+## @return     An array of notifications for the user, or a page.
 ##
 @socketio.on('get_notifications')
 @ensure_dict
@@ -34,22 +50,209 @@ def get_notifications(user, user_data):
     noti_ser = []
 
     if user is not None:
-        notifications = Notifications.query.filter_by(user = user.id).all()
-        noti_ser = [{"id": c.id, "user": c.user, "type": c.type.value, "destination": c.destination, "message": c.message, "redirect": c.redirect} for c in notifications]
+        query = Notifications.query.filter_by(user = user.id)
+
+        if wants_page(user_data):
+            emit('get_notifications', paginate(query, [Notifications.id], user_data, serialize_notification))
+            return
+
+        noti_ser = [serialize_notification(c) for c in query.all()]
     emit('get_notifications', noti_ser)
 
 
 ##
-## @brief      Sends new notifications to a user.
+## Notifications are created in three steps so the writer's transaction
+## does not wait for them:
 ##
-## @param      user  The user to send notifications to.
+## 1. The after_insert listeners below copy what they need from the new
+##    row into session.info, without queries or emits.
+## 2. After the commit, queue_notifications sends the collected events
+##    to the huey worker. They are processed inline when TESTING, and in
+##    a background task of the web process when there is no
+##    SOCKETIO_MESSAGE_QUEUE for the worker to push through.
+## 3. process_notifications looks up the recipients with one query per
+##    kind of event, inserts every notification in one statement and
+##    pushes each one to its user as 'new_notification'.
 ##
-## @return     An array of notifications for the user.
+## The batch is inserted with a multi-row INSERT rather than executemany
+## so it is one round trip and still returns the ids the pushes need.
+##
+
+# Finds usernames when they are indicated with the @ symbol.
+mention_regex = re.compile("(?<=^|(?<=[^a-zA-Z0-9-_\\.]))@([A-Za-z]+[A-Za-z0-9-_]+)")
+
+##
+## @brief      Gets the users mentioned in a note, once each and in the
+##             order they first appear.
+##
+def find_mentions(description):
+    return list(OrderedDict.fromkeys(mention_regex.findall(description or "")))
+
+
+def add_event(target, event):
+    session = object_session(target)
+    session.info.setdefault('notification_events', []).append(event)
+
+
+##
+## @brief      Sends the events of a committed transaction to the worker.
+##
+## @param      session  The session that was committed.
+##
+## @return     void
+##
+@listens_for(db.session, 'after_commit')
+def queue_notifications(session):
+    events = session.info.pop('notification_events', None)
+
+    if not events:
+        return
+
+    # Without a message queue the worker can't reach the clients, the
+    # notifications are delivered by a background task of this process
+    # instead, so the commit doesn't wait for them either.
+    if current_app.config['TESTING']:
+        process_notifications.call_local(events)
+    elif not current_app.config['SOCKETIO_MESSAGE_QUEUE']:
+        socketio.start_background_task(deliver_in_background, current_app._get_current_object(), events)
+    else:
+        process_notifications(events)
+
+
+def deliver_in_background(app, events):
+    with app.app_context():
+        deliver_notifications(events, socketio)
+
+
+## Drops the events of a transaction that was rolled back.
+@listens_for(db.session, 'after_rollback')
+def discard_notifications(session):
+    session.info.pop('notification_events', None)
+
+
+##
+## @brief      Creates and pushes the notifications for a list of events.
+##
+##             In the worker there is no app, one is created on first use
+##             and pushes go through the Socket.IO message queue.
+##
+## @param      events  The events collected by the listeners.
+##
+## @return     void
+##
+@huey.task()
+def process_notifications(events):
+    if has_app_context():
+        deliver_notifications(events, socketio)
+        return
+
+    app, emitter = worker_context()
+    with app.app_context():
+        deliver_notifications(events, emitter)
+
+
+# App and Socket.IO emitter of the worker process.
+worker = {}
+
+def worker_context():
+    if not worker:
+        from app import create_app
+        app = create_app(handlers = False)
+        queue = app.config['SOCKETIO_MESSAGE_QUEUE']
+
+        if not queue:
+            raise RuntimeError("SOCKETIO_MESSAGE_QUEUE must be set to push notifications from the worker.")
+        worker["app"], worker["socketio"] = app, SocketIO(message_queue = queue)
+    return worker["app"], worker["socketio"]
+
+
+##
+## @brief      Builds the notification rows for the events.
+##
+## @param      connection  The connection to the database.
+## @param      events      The events collected by the listeners.
+##
+## @return     A list of dicts with the notification columns.
+##
+def build_notifications(connection, events):
+    rows = []
+    by_type = {}
+
+    for event in events:
+        by_type.setdefault(event["type"], []).append(event)
+
+    notes = by_type.get(NotificationType.MentionedInNote.value, [])
+    if notes:
+        mentioned = {e["note"]: find_mentions(e["description"]) for e in notes}
+        names = set(u for users in mentioned.values() for u in users)
+        users = set(u.id for u in connection.execute(select([Users.id]).where(Users.id.in_(names)))) if names else set()
+        actions = {a.id: a for a in connection.execute(
+            select([Actions.id, Actions.title, Actions.charge]).where(Actions.id.in_(set(e["action"] for e in notes))))}
+
+        for event in notes:
+            action = actions.get(event["action"])
+            for u in mentioned[event["note"]]:
+                if u in users and action is not None:
+                    rows.append(notification_row(u, NotificationType.MentionedInNote, event["note"], action.title, action.charge))
+
+    for event in by_type.get(NotificationType.AssignedToAction.value, []):
+        rows.append(notification_row(event["user"], NotificationType.AssignedToAction, event["action"], event["title"], event["charge"]))
+
+    for event in by_type.get(NotificationType.MadeCommitteeHead.value, []):
+        rows.append(notification_row(event["user"], NotificationType.MadeCommitteeHead, event["committee"], event["title"], event["committee"]))
+
+    closes = by_type.get(NotificationType.CloseChargeRequest.value, [])
+    if closes:
+        # Read with the connection, admin_ids skips its cache then so the
+        # worker never sends requests to stale admins.
+        admins = Users.admin_ids(connection)
+        for event in closes:
+            for admin in admins:
+                rows.append(notification_row(admin, NotificationType.CloseChargeRequest, event["charge"], event["user_name"], event["charge"]))
+
+    requests = by_type.get(NotificationType.UserRequest.value, [])
+    if requests:
+        heads = dict(connection.execute(
+            select([Committees.id, Committees.head]).where(Committees.id.in_(set(e["committee"] for e in requests)))).fetchall())
+        for event in requests:
+            rows.append(notification_row(heads.get(event["committee"]), NotificationType.UserRequest, event["invitation"], event["user_name"], event["invitation"]))
+
+    return rows
+
+
+def notification_row(user, type, destination, message, redirect):
+    return {
+        "user": user,
+        "type": type,
+        "destination": str(destination),
+        "message": create_message(type, message),
+        "redirect": create_redirect_string(type, redirect)
+    }
+
+
+##
+## @brief      Inserts the notifications for the events and pushes them.
 ##
-def send_notifications(user):
-    notifications = Notifications.query.filter_by(user = user).all()
-    noti_ser = [{"id": c.id, "user": c.user, "type": c.type.value, "destination": c.destination, "message": c.message, "redirect": c.redirect} for c in notifications]
-    emit('get_notifications', noti_ser, room= user)
+## @param      events   The events collected by the listeners.
+## @param      emitter  The SocketIO used for pushes.
+##
+## @return     void
+##
+def deliver_notifications(events, emitter):
+    # Runs on its own connection, the session may be finishing a commit.
+    with db.engine.begin() as connection:
+        rows = build_notifications(connection, events)
+
+        if not rows:
+            return
+
+        # One INSERT ... VALUES (...), (...) RETURNING id for the whole batch.
+        ids = [r[0] for r in connection.execute(
+            Notifications.__table__.insert().values(rows).returning(Notifications.id))]
+
+    for id, row in zip(ids, rows):
+        notification = dict(row, id= id, type= row["type"].value)
+        emitter.emit('new_notification', notification, room= notification["user"])
 
 
 ##
@@ -64,22 +267,12 @@ def send_notifications(user):
 ##
 @listens_for(Notes, 'after_insert')
 def new_note(mapper, connection, new_note):
-    # Finds usernames when they are indicated with the @ symbol, stores them in 'mentioned'
-    user_regex = "(?<=^|(?<=[^a-zA-Z0-9-_\.]))@([A-Za-z]+[A-Za-z0-9-_]+)"
-    mentioned = re.findall(user_regex, new_note.description)
-    action = Actions.query.filter_by(id= int(new_note.action)).first()
-
-    for u in mentioned:
-        user = Users.query.filter_by(id= u).first()
-        if user is not None:
-            connection.execute(notifications_table, 
-                user = u,
-                type = NotificationType.MentionedInNote,
-                destination = new_note.id,
-                message = create_message(NotificationType.MentionedInNote, action.title),
-                redirect = create_redirect_string(NotificationType.MentionedInNote, action.charge)
-            )
-            send_notifications(u)
+    add_event(new_note, {
+        "type": NotificationType.MentionedInNote.value,
+        "note": new_note.id,
+        "action": int(new_note.action),
+        "description": new_note.description
+    })
 
 
 ##
@@ -94,14 +287,13 @@ def new_note(mapper, connection, new_note):
 ##
 @listens_for(Actions, 'after_insert')
 def new_action(mapper, connection, new_action):
-    connection.execute(notifications_table,
-        user = new_action.assigned_to,
-        type = NotificationType.AssignedToAction,
-        destination = new_action.id,
-        message = create_message(NotificationType.AssignedToAction, new_action.title),
-        redirect = create_redirect_string(NotificationType.AssignedToAction, new_action.charge)
-    )
-    send_notifications(new_action.assigned_to)
+    add_event(new_action, {
+        "type": NotificationType.AssignedToAction.value,
+        "user": new_action.assigned_to,
+        "action": new_action.id,
+        "title": new_action.title,
+        "charge": new_action.charge
+    })
 
 
 ##
@@ -116,15 +308,12 @@ def new_action(mapper, connection, new_action):
 ##
 @listens_for(Committees, 'after_insert')
 def new_committee(mapper, connection, new_committee):
-
-    connection.execute(notifications_table,
-        user = new_committee.head,
-        type = NotificationType.MadeCommitteeHead,
-        destination = new_committee.id,
-        message = create_message(NotificationType.MadeCommitteeHead, new_committee.title),
-        redirect = create_redirect_string(NotificationType.MadeCommitteeHead, new_committee.id)
-    )
-    send_notifications(new_committee.head)
+    add_event(new_committee, {
+        "type": NotificationType.MadeCommitteeHead.value,
+        "user": new_committee.head,
+        "committee": new_committee.id,
+        "title": new_committee.title
+    })
 
 ##
 ## @brief      Notifies an admin when
@@ -138,20 +327,12 @@ def new_committee(mapper, connection, new_committee):
 ##
 @listens_for(Invitations, 'after_insert')
 def close_charge(mapper, connection, new_request):
-
-    admins = db.session.query(Users).filter(Users.is_admin == True).all()
-    
-    for admin in admins:
-        if new_request.charge_id:
-            connection.execute(notifications_table,
-                user = admin.id,
-                type = NotificationType.CloseChargeRequest,
-                destination = new_request.charge_id,
-                viewed = False,
-                message = create_message(NotificationType.CloseChargeRequest, new_request.user_name),
-                redirect = create_redirect_string(NotificationType.CloseChargeRequest, new_request.charge_id)
-            )
-            send_notifications(admin.id)
+    if new_request.charge_id:
+        add_event(new_request, {
+            "type": NotificationType.CloseChargeRequest.value,
+            "charge": new_request.charge_id,
+            "user_name": new_request.user_name
+        })
 
 ##
 ## @brief      Notifies a committee head when
@@ -166,14 +347,12 @@ def close_charge(mapper, connection, new_request):
 @listens_for(Invitations, 'after_insert')
 def new_request(mapper, connection, new_request):
     if not new_request.isInvite and not new_request.charge_id:
-        connection.execute(notifications_table,
-            user = new_request.committee.head,
-            type = NotificationType.UserRequest,
-            destination = new_request.id,
-            message = create_message(NotificationType.UserRequest, new_request.user_name),
-            redirect = create_redirect_string(NotificationType.UserRequest, new_request.id)
-        )
-        send_notifications(new_request.committee.head)
+        add_event(new_request, {
+            "type": NotificationType.UserRequest.value,
+            "committee": new_request.committee_id,
+            "invitation": new_request.id,
+            "user_name": new_request.user_name
+        })
         
 
 ##
@@ -28,7 +28,7 @@ class NotificationType(Enum):
 class Notifications(db.Model):
     __tablename__ = 'notifications'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    user = db.Column(db.ForeignKey('users.id'))
+    user = db.Column(db.ForeignKey('users.id'), index= True)
     type = db.Column(ChoiceType(NotificationType, impl = db.String()))
     destination = db.Column(db.String)
     message = db.Column(db.String)
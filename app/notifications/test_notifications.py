@@ -7,14 +7,19 @@ created on: 11/09/18
 
 import pytest
 import config
-from app import app, db, socketio
+from app import create_app, db, socketio
 from app.users.models import Users
 from app.notifications.models import Notifications, NotificationType
 from app.charges.controllers import Charges
 from app.committees.controllers import Committees
 from app.notifications.controllers import *
-from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import and_
+from mock import patch
+from app.query_counter import QueryCounter
+from app.pagination import InvalidCursor
+
+app = create_app('config_testing')
+
 
 class TestNotifications(object):
 
@@ -24,7 +29,8 @@ class TestNotifications(object):
         
         app.config['TESTING'] = True
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -142,6 +148,7 @@ class TestNotifications(object):
     def teardown_class(self):
         db.session.close()
         db.drop_all()
+        self.context.pop()
 
     # Test when a user is made committee head on create.
     def test_new_committee(self):
@@ -173,7 +180,8 @@ class TestNotifications(object):
             'message': 'You have been assigned to the task: test title',
             'redirect': '/charge/10'
         }
-        assert received[0]["args"][0][0] == expected
+        assert received[0]["name"] == "new_notification"
+        assert received[0]["args"][0] == expected
 
 
     # Test when a user sends a request to join a committee.
@@ -217,7 +225,8 @@ class TestNotifications(object):
             'message': 'You have been mentioned in a note. In the task: Test Action',
             'redirect': '/charge/10'
         }
-        assert received[0]["args"][0][0] == expected
+        assert received[0]["name"] == "new_notification"
+        assert received[0]["args"][0] == expected
 
     def test_no_user_get_notifications(self):
         user_data = {
@@ -226,4 +235,109 @@ class TestNotifications(object):
 
         self.socketio.emit('get_notifications', user_data)
         received = self.socketio.get_received()
-        assert received[0]["args"][0] == []
\ No newline at end of file
+        assert received[0]["args"][0] == []
+
+
+    # Test only the new notification is pushed, not the whole inbox.
+    def test_new_notification_single_row(self):
+        for i in range(5):
+            db.session.add(Notifications(user = "testuser", type = NotificationType.AssignedToAction,
+                destination = str(i), message = "old", redirect = "/charge/10"))
+        db.session.commit()
+
+        self.socketio.emit('create_action', self.test_action_dict)
+        received = self.socketio.get_received()
+        pushed = [r for r in received if r["name"] == "new_notification"]
+
+        assert len(pushed) == 1
+        assert pushed[0]["args"][0]["id"] == 6
+        assert pushed[0]["args"][0]["message"] == 'You have been assigned to the task: test title'
+
+    # Test getting notifications a page at a time, newest first.
+    def test_get_notifications_paginated(self):
+        for i in range(5):
+            db.session.add(Notifications(user = "testuser", type = NotificationType.AssignedToAction,
+                destination = str(i), message = "test", redirect = "/charge/10"))
+        db.session.commit()
+
+        self.socketio.emit('get_notifications', {"token": self.user_token, "limit": 2})
+        page = self.socketio.get_received()[0]["args"][0]
+        assert [n["id"] for n in page["items"]] == [5, 4]
+        assert page["next_cursor"] == 4
+
+        self.socketio.emit('get_notifications', {"token": self.user_token, "limit": 2, "cursor": 2})
+        page = self.socketio.get_received()[0]["args"][0]
+        assert [n["id"] for n in page["items"]] == [1]
+        assert page["next_cursor"] is None
+
+    # Test a cursor that doesn't match the sort keys is refused.
+    def test_get_notifications_invalid_cursor(self):
+        for cursor in ["abc", [1, 2], {"id": 1}, True]:
+            self.socketio.emit('get_notifications', {"token": self.user_token, "cursor": cursor})
+            page = self.socketio.get_received()[0]["args"][0]
+            assert page == InvalidCursor
+
+    # Test the page size is capped.
+    def test_get_notifications_limit_capped(self):
+        app.config['PAGE_SIZE_MAX'] = 3
+        for i in range(5):
+            db.session.add(Notifications(user = "testuser", type = NotificationType.AssignedToAction,
+                destination = str(i), message = "test", redirect = "/charge/10"))
+        db.session.commit()
+
+        self.socketio.emit('get_notifications', {"token": self.user_token, "limit": 1000})
+        page = self.socketio.get_received()[0]["args"][0]
+        app.config['PAGE_SIZE_MAX'] = config.PAGE_SIZE_MAX
+
+        assert len(page["items"]) == 3
+        assert page["next_cursor"] == 3
+
+    # Test a rolled back insert creates no notification.
+    def test_rollback_no_notification(self):
+        db.session.add(Actions(id = 11, title = "Rolled Back", charge = 10, assigned_to = "testuser"))
+        db.session.flush()
+        db.session.rollback()
+
+        assert Notifications.query.count() == 0
+        assert db.session.info.get('notification_events') is None
+
+    # Test the notifications of one commit are created together after it.
+    def test_notifications_batched_after_commit(self):
+        db.session.add(Actions(id = 11, title = "First", charge = 10, assigned_to = "testuser"))
+        db.session.add(Actions(id = 12, title = "Second", charge = 10, assigned_to = "testuser2"))
+        db.session.flush()
+
+        assert len(db.session.info['notification_events']) == 2
+        assert Notifications.query.count() == 0
+
+        db.session.commit()
+        notifications = Notifications.query.order_by(Notifications.id).all()
+
+        assert [n.user for n in notifications] == ["testuser", "testuser2"]
+        assert [n.destination for n in notifications] == ["11", "12"]
+
+    # Test a note mentioning many users resolves them in one query.
+    def test_new_note_many_mentions(self):
+        for i in range(50):
+            db.session.add(Users(id = "mention{}".format(i), first_name = "Mention", last_name = "User",
+                email = "mention{}@test.com".format(i), is_admin = False))
+        db.session.commit()
+
+        user_data = {
+            "token": self.user_token,
+            "action": 10,
+            "description": " ".join("@mention{0} @mention{0}".format(i) for i in range(50))
+        }
+
+        with patch.object(socketio, "emit") as push, QueryCounter() as counter:
+            self.socketio.emit('create_note', user_data)
+
+        notifications = Notifications.query.filter(Notifications.user.like("mention%")).all()
+        assert sorted(n.user for n in notifications) == sorted("mention{}".format(i) for i in range(50))
+
+        statements = [s for s in counter.statements if "notifications" in s or "users.id IN" in s]
+        assert len([s for s in statements if s.startswith("INSERT INTO notifications")]) == 1
+        assert len([s for s in statements if "users.id IN" in s]) == 1
+
+        rooms = [c[1]["room"] for c in push.call_args_list if c[0][0] == "new_notification"]
+        assert sorted(rooms) == sorted("mention{}".format(i) for i in range(50))
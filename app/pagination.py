@@ -0,0 +1,133 @@
+"""
+filename: pagination.py
+description: Keyset pagination for the list handlers.
+created on: 10/18/26
+"""
+
+from datetime import datetime
+from dateutil.parser import isoparse
+from flask import current_app
+from sqlalchemy import tuple_
+
+# Page sent instead of the rows when the cursor can't be used.
+InvalidCursor = {"error": "Invalid cursor."}
+
+
+##
+## Pages are requested by sending "limit" and/or "cursor" along with the
+## usual handler data and are emitted as
+##
+##     {"items": [...], "next_cursor": <cursor or None>}
+##
+## Rows are returned newest first unless the handler says otherwise. To
+## get the next page, send the "next_cursor" of the previous one back as
+## "cursor". Handlers keep emitting the full list when neither key is
+## sent.
+##
+## Cursors are the sort keys of the last row sent, e.g. its id or its
+## [created_at, id]. Rows inserted while paging sort before the cursor,
+## so later pages never repeat or skip a row.
+##
+
+##
+## @brief      Checks if the client asked for a page.
+##
+## @param      user_data  The handler data.
+##
+## @return     True if a page was requested.
+##
+def wants_page(user_data):
+    return "limit" in user_data or "cursor" in user_data
+
+
+##
+## @brief      Gets the page size requested by the client, bounded by
+##             the PAGE_SIZE_MAX setting.
+##
+def page_limit(user_data):
+    try:
+        limit = int(user_data.get("limit", current_app.config['PAGE_SIZE']))
+    except (TypeError, ValueError):
+        limit = current_app.config['PAGE_SIZE']
+
+    return max(1, min(limit, current_app.config['PAGE_SIZE_MAX']))
+
+
+##
+## @brief      Checks a cursor sent by the client against the sort keys.
+##
+## @param      keys    The sort columns.
+## @param      cursor  The cursor, a value for one key or a list with a
+##                     value per key.
+##
+## @return     The list of key values, None if the cursor is invalid.
+##
+def _parse_cursor(keys, cursor):
+    values = [cursor] if len(keys) == 1 else cursor
+
+    if type(values) is not list or len(values) != len(keys):
+        return None
+
+    parsed = []
+    for key, value in zip(keys, values):
+        python_type = key.type.python_type
+
+        try:
+            if python_type is datetime and type(value) is str:
+                parsed.append(isoparse(value))
+            elif python_type is int and type(value) is int:
+                parsed.append(value)
+            elif python_type is str and type(value) is str:
+                parsed.append(value)
+            else:
+                return None
+        except ValueError:
+            return None
+    return parsed
+
+
+def _cursor_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+##
+## @brief      Gets a page of a query.
+##
+## @param      query      The query to paginate.
+## @param      keys       Columns that uniquely order the rows, e.g.
+##                        [Model.created_at, Model.id].
+## @param      user_data   The handler data with "limit" and "cursor".
+## @param      serialize   Function that serializes a row.
+## @param      descending  False to page in ascending order instead.
+##
+## @return     Dict with the serialized "items" and the "next_cursor", or
+##             InvalidCursor if the cursor doesn't match the keys.
+##
+def paginate(query, keys, user_data, serialize, descending = True):
+    limit = page_limit(user_data)
+    cursor = user_data.get("cursor")
+
+    if cursor is not None:
+        values = _parse_cursor(keys, cursor)
+
+        if values is None:
+            return InvalidCursor
+
+        if len(keys) == 1:
+            key, cursor = keys[0], values[0]
+        else:
+            key, cursor = tuple_(*keys), tuple_(*values)
+        query = query.filter(key < cursor if descending else key > cursor)
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = [_cursor_value(getattr(rows[-1], key.key)) for key in keys]
+        next_cursor = last[0] if len(keys) == 1 else last
+
+    return {"items": [serialize(row) for row in rows], "next_cursor": next_cursor}
@@ -0,0 +1,54 @@
+"""
+filename: query_counter.py
+description: Counts the SQL statements sent to the database.
+created on: 10/18/26
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+##
+## @brief      Context manager that records every SQL statement
+##             executed by any engine while it is active.
+##
+##             with QueryCounter() as counter:
+##                 socketio.emit('get_actions', 10)
+##             assert counter.count == 1
+##
+class QueryCounter():
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(Engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    ## Number of statements executed so far.
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+##
+## @brief      Counts the statements executed by the handler of an event.
+##
+## @param      client  The Socket.IO test client.
+## @param      event   The event name.
+## @param      args    The event data.
+##
+## @return     The number of statements, the replies are discarded.
+##
+def count_event(client, event, *args):
+    with QueryCounter() as counter:
+        client.emit(event, *args)
+
+    client.get_received()
+    return counter.count
@@ -0,0 +1,102 @@
+"""
+filename: rooms.py
+description: Socket.IO rooms for committee and charge views.
+created on: 10/18/26
+"""
+
+from flask_socketio import join_room, leave_room
+from app.decorators import ensure_dict
+from app.users.models import Users
+from app import socketio
+
+
+##
+## Clients join these rooms when they load a view (get_charges,
+## get_charge, get_committee, get_members, get_actions) and changes
+## made afterwards are only sent to the matching room.
+##
+## - committee:<id>           Everyone viewing the committee.
+## - committee:<id>:members   Viewers allowed to see private charges.
+## - charge:<id>              Everyone viewing the charge.
+##
+
+def committee_room(committee_id):
+    return "committee:{}".format(committee_id)
+
+
+def committee_members_room(committee_id):
+    return "committee:{}:members".format(committee_id)
+
+
+def charge_room(charge_id):
+    return "charge:{}".format(charge_id)
+
+
+##
+## @brief      Gets the room that should receive changes to a charge.
+##
+## @param      committee_id  The committee of the charge.
+## @param      private       True if the charge is private.
+##
+## @return     The room name.
+##
+def charge_audience(committee_id, private):
+    if private:
+        return committee_members_room(committee_id)
+    return committee_room(committee_id)
+
+
+##
+## @brief      Joins the rooms of a committee view.
+##
+## @param      committee_id  The committee being viewed.
+## @param      members       True if the client may see private charges.
+##
+def join_committee_view(committee_id, members = False):
+    join_room(committee_room(committee_id))
+
+    if members:
+        join_room(committee_members_room(committee_id))
+
+
+##
+## @brief      Removes a user's connections from the members room of a
+##             committee, call after they stop being a member.
+##
+##             Connections are found in the sessions bound with
+##             'authenticate' and in the user's own room, which clients
+##             that send a token join. Only the connections of this
+##             process are removed.
+##
+## @param      user_id       The user that left the committee.
+## @param      committee_id  The committee.
+##
+def leave_committee_members(user_id, committee_id):
+    sids = set(Users.session_ids(user_id))
+
+    try:
+        sids.update(socketio.server.manager.get_participants('/', user_id))
+    except KeyError:
+        # The user has no connection that sent a token.
+        pass
+
+    for sid in sids:
+        leave_room(committee_members_room(committee_id), sid= sid, namespace= '/')
+
+
+##
+## @brief      Stops sending changes of a view to the client.
+##
+## @param      user_data  Contains "committee_id" and/or "charge_id"
+##                        of the views that were closed.
+##
+@socketio.on('leave_view')
+@ensure_dict
+def leave_view(user_data):
+
+    if "committee_id" in user_data:
+        leave_room(committee_room(user_data["committee_id"]))
+        leave_room(committee_members_room(user_data["committee_id"]))
+
+    if "charge_id" in user_data:
+        leave_room(charge_room(user_data["charge_id"]))
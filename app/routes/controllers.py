@@ -4,31 +4,40 @@ description: Controller for Routes.
 created by: Omar De La Hoz (oed7416@rit.edu)
 created on: 11/05/18
 """
-from flask import render_template, redirect, request
+from flask import Blueprint, render_template, redirect, request, current_app, abort, Response
+from app.metrics import metrics
 from saml import SamlRequest, SamlManager
 from flask_login import logout_user
-from app import app
+
+routes = Blueprint('routes', __name__)
 
 # Route to shibboleth login.
-@app.route('/saml/login')
+@routes.route('/saml/login')
 def login_page():
 	return redirect("/saml/login")
 
 # Route to shibboleth logout.
-@app.route('/saml/logout')
+@routes.route('/saml/logout')
 def logout_page():
 	logout_user()
 	return redirect('/')
 
+# Route to the socket handler metrics, in the Prometheus text format.
+@routes.route('/metrics')
+def get_metrics():
+	return Response(metrics.render(), mimetype= 'text/plain; version=0.0.4')
+
 # Route to everything else in the app.
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+@routes.route('/', defaults={'path': ''})
+@routes.route('/<path:path>')
 def catch_all(path):
     return render_template("index.html")
 
-# Route to get shibboleth metadata.
-if app.config['DEBUG']:
-	@app.route('/metadata/')
-	def metadata():
-	  saml = SamlRequest(request)
-	  return saml.generate_metadata()
+# Route to get shibboleth metadata, only in debug.
+@routes.route('/metadata/')
+def metadata():
+	if not current_app.config['DEBUG']:
+		abort(404)
+
+	saml = SamlRequest(request)
+	return saml.generate_metadata()
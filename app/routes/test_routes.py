@@ -6,7 +6,10 @@ created on: 11/05/18
 """
 import pytest
 import config
-from app import app
+from app import create_app
+
+app = create_app('config_testing')
+
 
 class TestRoutes(object):
 
@@ -0,0 +1,171 @@
+"""
+filename: test_message_queue.py
+description: Tests for Socket.IO fan-out between nodes through the message queue
+and for the queue setting of create_app.
+created on: 10/18/26
+"""
+
+import threading
+import time
+import uuid
+import config_testing
+from mock import patch
+from types import SimpleNamespace
+from flask import Flask
+from flask_socketio import SocketIO
+from socketio import packet
+from app import create_app, socketio
+from app.rooms import committee_room
+
+
+##
+## @brief      In-process stand-in for the Redis pub/sub commands used
+##             by the Socket.IO message queue.
+##
+class LocalRedis(object):
+
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def from_url(self, url):
+        return self
+
+    def publish(self, channel, data):
+        with self.lock:
+            subscribers = [s for s in self.subscribers if channel in s.channels]
+
+        for subscriber in subscribers:
+            subscriber.messages.append({
+                "type": "message",
+                "channel": channel.encode("utf-8"),
+                "data": data
+            })
+            subscriber.ready.set()
+        return len(subscribers)
+
+    def pubsub(self):
+        return LocalPubSub(self)
+
+
+class LocalPubSub(object):
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.channels = set()
+        self.messages = []
+        self.ready = threading.Event()
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+        with self.redis.lock:
+            self.redis.subscribers.append(self)
+
+    def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    def listen(self):
+        while True:
+            self.ready.wait()
+            self.ready.clear()
+            while self.messages:
+                yield self.messages.pop(0)
+
+
+##
+## @brief      A Socket.IO server connected to the shared message queue,
+##             standing in for one Flask process behind the load balancer.
+##
+class Node(object):
+
+    def __init__(self, redis, listen = True):
+        self.received = {}
+
+        with patch("redis.Redis.from_url", redis.from_url):
+            if listen:
+                self.socketio = SocketIO(Flask(__name__), message_queue= "redis://", async_mode= "threading")
+            else:
+                # Write-only, like the huey worker or any other script.
+                self.socketio = SocketIO(message_queue= "redis://")
+
+        if listen:
+            server = self.socketio.server
+            server._send_packet = self._capture
+            server.manager_initialized = True
+            threading.Thread(target= server.manager._thread, daemon= True).start()
+
+    def _capture(self, sid, pkt):
+        if pkt.packet_type == packet.EVENT:
+            self.received.setdefault(sid, []).append(pkt.data)
+
+    ## Connects a client to this node and adds it to a room.
+    def connect(self, room):
+        sid = uuid.uuid4().hex
+        self.socketio.server.manager.connect(sid, "/")
+        self.socketio.server.enter_room(sid, room)
+        return sid
+
+    ## Waits for the events received by a client.
+    def wait_for(self, sid, count = 1, timeout = 5):
+        deadline = time.time() + timeout
+
+        while len(self.received.get(sid, [])) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return self.received.get(sid, [])
+
+
+## Test configuration with the given message queue.
+def queue_config(url):
+    settings = {key: getattr(config_testing, key) for key in dir(config_testing) if key.isupper()}
+    return SimpleNamespace(**dict(settings, SOCKETIO_MESSAGE_QUEUE = url))
+
+
+class TestMessageQueue(object):
+
+    def setup_method(self, method):
+        self.redis = LocalRedis()
+        self.node_a = Node(self.redis)
+        self.node_b = Node(self.redis)
+
+    # Test a room broadcast on node A reaches a client on node B.
+    def test_room_broadcast_between_nodes(self):
+        client = self.node_b.connect(committee_room("testcommittee"))
+        other = self.node_b.connect(committee_room("othercommittee"))
+
+        self.node_a.socketio.emit("charge_added", {"id": 10}, room= committee_room("testcommittee"))
+
+        assert self.node_b.wait_for(client) == [["charge_added", {"id": 10}]]
+        assert self.node_b.received.get(other) is None
+
+    # Test a user push from a write-only process reaches the user's node.
+    def test_user_push_from_worker(self):
+        client = self.node_b.connect("testuser")
+        worker = Node(self.redis, listen= False)
+
+        worker.socketio.emit("new_notification", {"id": 1}, room= "testuser")
+
+        assert self.node_b.wait_for(client) == [["new_notification", {"id": 1}]]
+
+    # Test every node receives a broadcast once.
+    def test_broadcast_all_nodes(self):
+        client_a = self.node_a.connect("testuser")
+        client_b = self.node_b.connect("testuser2")
+
+        self.node_a.socketio.emit("committee_added", {"id": "testcommittee"})
+
+        assert self.node_a.wait_for(client_a) == [["committee_added", {"id": "testcommittee"}]]
+        assert self.node_b.wait_for(client_b) == [["committee_added", {"id": "testcommittee"}]]
+
+    # Test the queue in the config is given to Socket.IO.
+    def test_message_queue_from_config(self):
+        with patch.object(socketio, "init_app") as init_app:
+            app = create_app(queue_config("redis://redis:6379/0"))
+
+        init_app.assert_called_once_with(app, message_queue = "redis://redis:6379/0")
+
+    # Test Socket.IO runs without a queue when none is set.
+    def test_no_message_queue(self):
+        with patch.object(socketio, "init_app") as init_app:
+            app = create_app(queue_config(None))
+
+        init_app.assert_called_once_with(app, message_queue = None)
@@ -0,0 +1,70 @@
+"""
+filename: test_metrics.py
+description: Tests for the socket handler metrics.
+created on: 10/18/26
+"""
+
+import pytest
+import config
+from app import create_app, db, socketio
+from app.metrics import metrics, Histogram
+from app.committees.models import Committees
+from app.notifications.controllers import new_committee
+
+app = create_app('config_testing')
+
+
+class TestMetrics(object):
+
+    @classmethod
+    def setup_class(self):
+        self.app = app.test_client()
+
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
+        self.context = app.app_context()
+        self.context.push()
+        db.session.close()
+        db.drop_all()
+        db.create_all()
+        db.event.remove(Committees, "after_insert", new_committee)
+
+    def setup_method(self, method):
+        metrics.clear()
+        self.socketio = socketio.test_client(app)
+        self.socketio.connect()
+
+    def teardown_method(self, method):
+        self.socketio.disconnect()
+
+    @classmethod
+    def teardown_class(self):
+        db.session.close()
+        db.drop_all()
+        db.event.listen(Committees, "after_insert", new_committee)
+        self.context.pop()
+
+    # Test a histogram counts each value in every bucket it fits.
+    def test_histogram(self):
+        histogram = Histogram("test", "Test.", [1, 5])
+        histogram.observe("event", 0)
+        histogram.observe("event", 3)
+        histogram.observe("event", 10)
+        lines = histogram.render()
+
+        assert 'test_bucket{event="event",le="1"} 1' in lines
+        assert 'test_bucket{event="event",le="5"} 2' in lines
+        assert 'test_bucket{event="event",le="+Inf"} 3' in lines
+        assert 'test_sum{event="event"} 13' in lines
+        assert 'test_count{event="event"} 3' in lines
+
+    # Test an event records its time and statements on /metrics.
+    def test_event_metrics(self):
+        self.socketio.emit("get_committees")
+        self.socketio.emit("get_committees")
+        body = self.app.get("/metrics").get_data(as_text= True)
+
+        assert 'socketio_event_duration_seconds_count{event="get_committees"} 2' in body
+        assert 'socketio_event_db_statements_sum{event="get_committees"} 2' in body
+        assert 'socketio_event_db_duration_seconds_count{event="get_committees"} 2' in body
+
@@ -0,0 +1,151 @@
+"""
+filename: test_query_budgets.py
+description: Checks the statements of each read handler stay within its
+budget and don't grow with the data.
+created on: 10/18/26
+"""
+
+import pytest
+import config
+from app import create_app, db, socketio
+from app.authorization import membership_cache
+from app.users.models import Users, token_cache, admin_cache
+from app.notifications.controllers import build_notifications
+from app.notifications.models import NotificationType
+from app.query_counter import QueryCounter, count_event
+from benchmarks.dataset import generate
+
+app = create_app('config_testing')
+
+# Small and large datasets, every handler below reads more rows in the
+# large one.
+SMALL = {"members_per_committee": 3, "actions_per_charge": 2, "notes_per_action": 2,
+         "minutes_per_committee": 2, "committee_notes_per_committee": 2, "notifications_per_user": 2}
+LARGE = {"members_per_committee": 40, "actions_per_charge": 30, "notes_per_action": 20,
+         "minutes_per_committee": 30, "committee_notes_per_committee": 30, "notifications_per_user": 40,
+         "admins": 50}
+
+# Most statements each handler may execute, whatever the data size.
+BUDGETS = {
+    "get_committees": 1,
+    "get_members": 2,
+    "get_all_users": 1,
+    "get_all_charges": 1,
+    "get_charges": 4,
+    "get_actions": 4,
+    "get_notes": 1,
+    "get_minutes": 5,
+    "get_committee_notes": 1,
+    "get_notifications": 2,
+    "close_charge_request": 1,
+}
+
+
+class TestQueryBudgets(object):
+
+    @classmethod
+    def setup_class(self):
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
+        self.context = app.app_context()
+        self.context.push()
+        self.socketio = socketio.test_client(app)
+        self.socketio.connect()
+
+        self.small = self.measure(SMALL)
+        self.large = self.measure(LARGE)
+
+    @classmethod
+    def teardown_class(self):
+        self.socketio.disconnect()
+        db.session.close()
+        db.drop_all()
+        self.context.pop()
+
+    ##
+    ## @brief      Seeds a dataset and counts the statements of each
+    ##             handler, as the head of the first committee.
+    ##
+    @classmethod
+    def measure(self, sizes):
+        db.session.close()
+        db.drop_all()
+        db.create_all()
+
+        with db.engine.begin() as connection:
+            generate(connection, sizes = sizes)
+            # Whether a charge is private depends on the sizes, the first
+            # one is made private so get_actions checks the member.
+            connection.execute("UPDATE charges SET private = true WHERE id = 1")
+
+        token = Users.query.get("TestUser0").generate_auth().decode('ascii')
+        member_token = Users.query.get("TestUser1").generate_auth().decode('ascii')
+        events = {
+            "get_committees": (),
+            "get_members": ("TestCommittee0",),
+            "get_all_users": (),
+            "get_all_charges": (),
+            "get_charges": ({"token": token, "committee_id": "TestCommittee0"},),
+            "get_actions": ({"token": member_token, "charge_id": 1},),
+            "get_notes": ({"action_id": 1},),
+            "get_minutes": ({"token": token, "committee_id": "TestCommittee0"},),
+            "get_committee_notes": ("TestCommittee0",),
+            "get_notifications": ({"token": token},),
+        }
+        counts = {}
+
+        for event, args in events.items():
+            # Start every handler without cached users, roles or loaded rows.
+            token_cache.clear()
+            admin_cache.clear()
+            membership_cache.clear()
+            db.session.expunge_all()
+            counts[event] = count_event(self.socketio, event, *args)
+
+        # Close requests are notified to every admin by the worker, one
+        # request per member of the first committee, and LARGE has more
+        # admins.
+        closes = [{"type": NotificationType.CloseChargeRequest.value, "charge": 1, "user_name": "TestUser0"}
+                  for _ in range(sizes["members_per_committee"])]
+        with db.engine.connect() as connection, QueryCounter() as counter:
+            build_notifications(connection, closes)
+        counts["close_charge_request"] = counter.count
+
+        return counts
+
+    def check(self, event):
+        assert self.small[event] <= BUDGETS[event]
+        assert self.large[event] == self.small[event]
+
+    def test_get_committees(self):
+        self.check("get_committees")
+
+    def test_get_members(self):
+        self.check("get_members")
+
+    def test_get_all_users(self):
+        self.check("get_all_users")
+
+    def test_get_all_charges(self):
+        self.check("get_all_charges")
+
+    def test_get_charges(self):
+        self.check("get_charges")
+
+    def test_get_actions(self):
+        self.check("get_actions")
+
+    def test_get_notes(self):
+        self.check("get_notes")
+
+    def test_get_minutes(self):
+        self.check("get_minutes")
+
+    def test_get_committee_notes(self):
+        self.check("get_committee_notes")
+
+    def test_get_notifications(self):
+        self.check("get_notifications")
+
+    def test_close_charge_request(self):
+        self.check("close_charge_request")
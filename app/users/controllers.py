@@ -5,20 +5,31 @@ created by: Omar De La Hoz (oed7416@rit.edu)
 created on: 09/07/17
 """
 
-from flask_socketio import emit
+from flask_socketio import emit, join_room
 from app.decorators import ensure_dict, get_user
 from app import socketio, db
 from app.users.models import Users, Roles
 from app.users.users_response import Response
+from app.pagination import wants_page, paginate
+from app.authorization import forget_memberships
 from app import saml_manager
 from flask_login import login_user, current_user
-from flask import redirect, jsonify
+from flask import redirect, jsonify, request
 import ldap
 
+def serialize_user(user):
+    return {"username": user.id, "name": user.first_name + " " + user.last_name}
+
+# Pages of users ("limit" and "cursor") are sorted by username.
 @socketio.on('get_all_users')
-def get_all_users():
-    users = Users.query.filter_by().all()
-    users_ser = [{"username": user.id, "name": user.first_name + " " + user.last_name} for user in users]
+def get_all_users(user_data = None):
+    query = Users.query.filter_by()
+
+    if type(user_data) is dict and wants_page(user_data):
+        emit('get_all_users', paginate(query, [Users.id], user_data, serialize_user, descending = False))
+        return
+
+    users_ser = [serialize_user(user) for user in query.all()]
     emit('get_all_users', users_ser)
     return;
 
@@ -48,6 +59,7 @@ def login_from_acs(acs):
 
             db.session.add(user)
             db.session.commit()
+            Users.forget_admins()
         
         login_user(user)
         return redirect('/')
@@ -68,6 +80,39 @@ def verify(user, user_data):
     })
 
 
+##
+## @brief      Binds a user to the socket connection, events sent
+##             afterwards without a token are made as this user.
+##
+## @param      user_data  Contains the "token" of the user, an empty
+##                        or invalid token removes the binding.
+##
+## @emit       The user's admin flag and username, AuthError if
+##             the token is invalid.
+##
+@socketio.on('authenticate')
+@ensure_dict
+def authenticate(user_data):
+    user = Users.verify_auth(user_data.get("token") or "")
+
+    if not user:
+        Users.unbind_session(request.sid)
+        emit('authenticate', Response.AuthError)
+        return;
+
+    Users.bind_session(request.sid, user)
+    join_room(user.id)
+    emit('authenticate', {
+        'admin': user.is_admin,
+        'username': user.id
+    })
+
+
+@socketio.on('disconnect')
+def disconnect_user():
+    Users.unbind_session(request.sid)
+
+
 @socketio.on('auth')
 @ensure_dict
 def login_ldap(credentials):
@@ -116,6 +161,7 @@ def login_ldap(credentials):
 
             db.session.add(user)
             db.session.commit()
+            Users.forget_admins()
             token = user.generate_auth()
             emit('auth', {'token': token.decode('ascii')})
 
@@ -170,6 +216,9 @@ def edit_roles(user, user_data):
 
     try:
         db.session.commit()
+        Users.refresh_auth(edit_user)
+        Users.forget_admins()
+        forget_memberships(edit_user.id)
         emit('edit_roles', {"success": "Role set to " + role.value + "."})
     except Exception as e:
         db.session.rollback()
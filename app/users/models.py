@@ -4,12 +4,30 @@ description: Model for Users.
 created by: Omar De La Hoz (oed7416@rit.edu)
 created on: 08/31/17
 """
-from app import app, db, login_manager
+from app import db, login_manager
+from flask import current_app
+from app.cache import TTLCache
 from enum import Enum
+import config
+import time
 from flask_login import UserMixin
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 from itsdangerous import (TimedJSONWebSignatureSerializer
                           as Serializer, BadSignature, SignatureExpired)
 
+# Verified tokens, maps a token to (user id, is_admin).
+token_cache = TTLCache(config.TOKEN_CACHE_SIZE, config.TOKEN_CACHE_TTL)
+
+# Ids of the admin users, stored under a single key.
+admin_cache = TTLCache(1, config.ADMIN_CACHE_TTL)
+
+# Authenticated socket connections, maps a session id to (user id,
+# is_admin, expiry). The admin flag is read again after TOKEN_CACHE_TTL
+# seconds, so a role change made on another node reaches open
+# connections within that time.
+session_users = {}
+
 class Users(UserMixin, db.Model):
 	__tablename__ = 'users'
 	id = db.Column(db.String, primary_key=True, unique= True)
@@ -26,13 +44,20 @@ class Users(UserMixin, db.Model):
 
 	# Generate an API token for user authentication.
 	def generate_auth(self, expiration = 60000000000000):
-		s = Serializer(app.config['SECRET_KEY'], expires_in = expiration)
+		s = Serializer(current_app.config['SECRET_KEY'], expires_in = expiration)
 		return s.dumps({ 'id': self.id })
 
 	# Check if an API token belongs to a user and return user data.
+	# Tokens verified recently are served from token_cache without
+	# checking the signature or querying the database again.
 	@staticmethod
 	def verify_auth(token):
-		s = Serializer(app.config['SECRET_KEY'])
+		identity = token_cache.get(token)
+
+		if identity is not None:
+			return Users.from_identity(*identity)
+
+		s = Serializer(current_app.config['SECRET_KEY'])
 
 		try:
 			data = s.loads(token)
@@ -41,8 +66,88 @@ class Users(UserMixin, db.Model):
 		except BadSignature:
 			return None
 		user = Users.query.get(data['id'])
+
+		if user is not None:
+			token_cache.set(token, (user.id, user.is_admin))
 		return user
 
+	# Build a session-bound user from its id and admin flag without
+	# querying the database, other columns are loaded on first access.
+	@staticmethod
+	def from_identity(id, is_admin):
+		user = Users(id = id, is_admin = is_admin)
+		make_transient_to_detached(user)
+		return db.session.merge(user, load = False)
+
+	# Bind a user to a socket connection.
+	@staticmethod
+	def bind_session(sid, user):
+		session_users[sid] = (user.id, user.is_admin, time.monotonic() + config.TOKEN_CACHE_TTL)
+
+	# Remove the user bound to a socket connection.
+	@staticmethod
+	def unbind_session(sid):
+		session_users.pop(sid, None)
+
+	# Get the user bound to a socket connection, None if there is none.
+	# An expired binding is checked against the database again.
+	@staticmethod
+	def from_session(sid):
+		identity = session_users.get(sid)
+
+		if identity is None:
+			return None
+
+		id, is_admin, expires = identity
+
+		if expires < time.monotonic():
+			user = Users.query.get(id)
+
+			if user is None:
+				Users.unbind_session(sid)
+			else:
+				Users.bind_session(sid, user)
+			return user
+		return Users.from_identity(id, is_admin)
+
+	# Get the socket connections bound to a user.
+	@staticmethod
+	def session_ids(user_id):
+		return [sid for sid, identity in list(session_users.items()) if identity[0] == user_id]
+
+	# Drop the cached tokens of a user and update its bound connections,
+	# call after changing its roles. Only this process is updated, other
+	# nodes pick up the change when their bindings expire.
+	@staticmethod
+	def refresh_auth(user):
+		token_cache.discard_where(lambda identity: identity[0] == user.id)
+
+		for sid, identity in list(session_users.items()):
+			if identity[0] == user.id:
+				Users.bind_session(sid, user)
+
+	# Get the ids of the admin users, cached for ADMIN_CACHE_TTL seconds.
+	# Pass a connection to query outside of the session, without the
+	# cache, e.g. from the worker where forget_admins() can't reach it.
+	@staticmethod
+	def admin_ids(connection = None):
+		if connection is not None:
+			return tuple(row[0] for row in connection.execute(select([Users.id]).where(Users.is_admin == True)))
+
+		ids = admin_cache.get("admins")
+
+		if ids is None:
+			query = select([Users.id]).where(Users.is_admin == True)
+			ids = tuple(row[0] for row in db.session.execute(query))
+			admin_cache.set("admins", ids)
+		return ids
+
+	# Drop the cached admin ids, call after creating a user or
+	# changing its roles.
+	@staticmethod
+	def forget_admins():
+		admin_cache.clear()
+
 ##
 ## @brief      Class for User Roles.
 ##
@@ -10,14 +10,15 @@ import pytest
 import config
 from mock import patch, MagicMock
 from pytest_mock import mocker
-from app import app, db, socketio
-from app.users.models import Users, Roles
+from app import create_app, db, socketio
+from app.users.models import Users, Roles, token_cache, admin_cache
+from app.query_counter import QueryCounter
 from app.users.controllers import login_from_acs
 from flask_socketio import SocketIOTestClient
-from flask_sqlalchemy import SQLAlchemy
 from flask import url_for
 from app.users.users_response import Response
 
+app = create_app('config_testing')
 
 
 class TestUser(object):
@@ -29,7 +30,8 @@ class TestUser(object):
         app.config['TESTING'] = True
         app.config['SECRET_KEY'] = "test_key"
         app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_TEST_DATABASE_URI
-        db = SQLAlchemy(app)
+        self.context = app.app_context()
+        self.context.push()
         db.session.close()
         db.drop_all()
         db.create_all()
@@ -40,6 +42,8 @@ class TestUser(object):
     def setup_method(self, method):
         db.drop_all()
         db.create_all()
+        token_cache.clear()
+        admin_cache.clear()
 
         # Create normal user for tests. 
         self.user = Users(id = "testuser") 
@@ -69,6 +73,7 @@ class TestUser(object):
         db.session.close()
         db.drop_all()
         self.socketio.disconnect()
+        self.context.pop()
 
     # Test empty login.
     def test_empty_login(self):
@@ -144,6 +149,92 @@ class TestUser(object):
         received = self.socketio.get_received()
         assert received[0]["args"][0] == Response.AuthError
 
+    # Test a verified token is served from the cache.
+    def test_verify_auth_cached(self):
+        self.socketio.emit("verify_auth", {"token": self.user_token})
+        self.socketio.get_received()
+
+        with QueryCounter() as counter:
+            self.socketio.emit("verify_auth", {"token": self.user_token})
+        received = self.socketio.get_received()
+
+        assert received[0]["args"][0] == {"admin": False, "username": "testuser"}
+        assert counter.count == 0
+
+    # Test cached tokens are dropped when a users role changes.
+    def test_verify_auth_cache_edit_roles(self):
+        self.socketio.emit("verify_auth", {"token": self.user_token})
+        self.socketio.emit("edit_roles",
+            {
+                "token": self.admin_user_token,
+                "username": "testuser",
+                "role": Roles.AdminUser.value
+            }
+        )
+        self.socketio.emit("verify_auth", {"token": self.user_token})
+
+        received = self.socketio.get_received()
+        assert received[0]["args"][0] == {"admin": False, "username": "testuser"}
+        assert received[2]["args"][0] == {"admin": True, "username": "testuser"}
+
+    # Test the admin ids are cached until a role changes.
+    def test_admin_ids_cache_edit_roles(self):
+        assert Users.admin_ids() == ("adminuser",)
+
+        with QueryCounter() as counter:
+            assert Users.admin_ids() == ("adminuser",)
+        assert counter.count == 0
+
+        self.socketio.emit("edit_roles",
+            {
+                "token": self.admin_user_token,
+                "username": "testuser",
+                "role": Roles.AdminUser.value
+            }
+        )
+        assert sorted(Users.admin_ids()) == ["adminuser", "testuser"]
+
+    # Test events without a token use the user bound to the connection.
+    def test_authenticate_session(self):
+        client = socketio.test_client(app)
+        client.emit("authenticate", {"token": self.user_token})
+        client.get_received()
+
+        with QueryCounter() as counter:
+            client.emit("verify_auth", {})
+        received = client.get_received()
+        client.disconnect()
+
+        assert received[0]["args"][0] == {"admin": False, "username": "testuser"}
+        assert counter.count == 0
+
+    # Test an expired binding reads the admin flag again, as after a
+    # role change made on another node.
+    def test_authenticate_session_expired(self):
+        client = socketio.test_client(app)
+        with patch("config.TOKEN_CACHE_TTL", -1):
+            client.emit("authenticate", {"token": self.user_token})
+        client.get_received()
+
+        self.user.is_admin = True
+        db.session.commit()
+        client.emit("verify_auth", {})
+        received = client.get_received()
+        client.disconnect()
+
+        assert received[0]["args"][0] == {"admin": True, "username": "testuser"}
+
+    # Test authenticating with an invalid token.
+    def test_authenticate_invalid_token(self):
+        client = socketio.test_client(app)
+        client.emit("authenticate", {"token": "thisisinvalid"})
+        client.emit("verify_auth", {})
+        received = client.get_received()
+        client.disconnect()
+
+        assert received[0]["args"][0] == Response.AuthError
+        assert received[1]["args"][0] == Response.AuthError
+
     # Test error in shibboleth login.
     def test_login_shib_error(self):
         with app.app_context():
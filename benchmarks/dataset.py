@@ -0,0 +1,240 @@
+"""
+filename: dataset.py
+description: Generates a synthetic dataset for tests and benchmarks.
+created on: 10/18/26
+
+Usage:
+    python benchmarks/dataset.py [scale] [database url]
+
+Scale 1 is the size of the old test_data.py, 10 committees and 110
+users, every other table grows with it. Rows are written with COPY so
+scale 100 takes a few seconds. The tables in the database
+(SQLALCHEMY_DATABASE_URI by default) are dropped first.
+
+From a benchmark:
+    with engine.begin() as conn:
+        counts = generate(conn, scale= 100)
+"""
+
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mimesis import Text, Address, Person
+
+
+# Rows per unit of scale.
+SIZES = {
+    "users": 100,
+    "admins": 10,
+    "committees": 10,
+    "members_per_committee": 9,
+    "charges_per_committee": 2,
+    "actions_per_charge": 5,
+    "notes_per_action": 3,
+    "minutes_per_committee": 4,
+    "charges_per_minute": 2,
+    "committee_notes_per_committee": 2,
+    "notifications_per_user": 5,
+}
+
+ROLES = ["NormalMember", "ActiveMember", "MinuteTaker"]
+NOTIFICATION_TYPES = ["MadeCommitteeHead", "AssignedToAction", "MentionedInNote", "UserRequest", "CloseChargeRequest"]
+
+# Generated text is picked from a pool, calling mimesis per row is
+# slower than writing the rows.
+POOL_SIZE = 500
+
+
+##
+## @brief      Writes rows to a table with COPY.
+##
+## @param      cursor   The DB-API cursor.
+## @param      table    The table name.
+## @param      columns  The column names.
+## @param      rows     Iterable of row tuples, None is written as NULL.
+##
+## @return     The number of rows written.
+##
+def copy_rows(cursor, table, columns, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    count = 0
+
+    for row in rows:
+        writer.writerow(["\\N" if value is None else value for value in row])
+        count += 1
+
+    buf.seek(0)
+    quoted = ", ".join('"{}"'.format(c) for c in columns)
+    cursor.copy_expert("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')".format(table, quoted), buf)
+    return count
+
+
+def array(values):
+    return "{" + ",".join('"{}"'.format(v.replace('"', '')) for v in values) + "}"
+
+
+##
+## @brief      Generates the dataset on an empty schema.
+##
+## @param      connection  The SQLAlchemy connection, the caller commits.
+## @param      scale       Multiplies every size in SIZES.
+## @param      years       The created_at dates are spread over this many
+##                         years before now.
+## @param      seed        Seed of the generated values.
+## @param      sizes       Dict overriding some of SIZES.
+##
+## @return     Dict of table name to the number of rows written.
+##
+def generate(connection, scale = 1, years = 4, seed = 0, sizes = None):
+    size = dict(SIZES, **(sizes or {}))
+    rand = random.Random(seed)
+    person = Person(seed = seed)
+    text = Text(seed = seed)
+    address = Address(seed = seed)
+
+    first_names = [person.name() for _ in range(POOL_SIZE)]
+    last_names = [person.last_name() for _ in range(POOL_SIZE)]
+    titles = [text.title()[:255] for _ in range(POOL_SIZE)]
+    sentences = [text.sentence()[:255] for _ in range(POOL_SIZE)]
+    words = [text.word() for _ in range(POOL_SIZE)]
+    cities = [address.city() for _ in range(POOL_SIZE)]
+
+    now = datetime.utcnow()
+    span = int(timedelta(days = 365 * years).total_seconds())
+
+    def created_at():
+        return (now - timedelta(seconds = rand.randrange(span))).isoformat()
+
+    users = ["TestUser{}".format(n) for n in range(size["users"] * scale)]
+    admins = ["AdminUser{}".format(n) for n in range(size["admins"] * scale)]
+    committees = ["TestCommittee{}".format(n) for n in range(size["committees"] * scale)]
+    per_committee = size["members_per_committee"] + 1
+
+    cursor = connection.connection.cursor()
+    counts = {}
+
+    counts["users"] = copy_rows(cursor, "users", ["id", "first_name", "last_name", "email", "is_admin"], (
+        (u, rand.choice(first_names), rand.choice(last_names), u + "@test.com", is_admin)
+        for people, is_admin in [(users, False), (admins, True)] for u in people
+    ))
+
+    # Each committee gets its own slice of users, the first one is the head.
+    members = {
+        c: [users[(i * per_committee + m) % len(users)] for m in range(per_committee)]
+        for i, c in enumerate(committees)
+    }
+
+    counts["committees"] = copy_rows(cursor, "committees",
+        ["id", "title", "description", "head", "location", "meeting_time", "meeting_day", "enabled"], (
+        (c, rand.choice(titles), rand.choice(sentences), members[c][0], rand.choice(cities),
+            "{:02d}00".format(rand.randint(8, 20)), rand.randint(0, 6), True)
+        for c in committees
+    ))
+
+    # Heads are members with the CommitteeHead role, as edit_committee
+    # makes them.
+    counts["members"] = copy_rows(cursor, "members", ["committees_id", "users_id", "role"], (
+        (c, u, "CommitteeHead" if u == members[c][0] else rand.choice(ROLES))
+        for c in committees for u in [members[c][0]] + sorted(set(members[c][1:]) - {members[c][0]})
+    ))
+
+    charges = [(n + 1, c) for n, c in enumerate(
+        c for c in committees for _ in range(size["charges_per_committee"]))]
+
+    counts["charges"] = copy_rows(cursor, "charges",
+        ["id", "title", "author", "description", "created_at", "committee", "objectives", "schedule",
+         "resources", "stakeholders", "priority", "status", "private"], (
+        (id, rand.choice(titles), members[c][0], rand.choice(sentences), created_at(), c,
+            array(rand.sample(words, 2)), array(rand.sample(words, 2)), array(rand.sample(words, 2)),
+            array(rand.sample(words, 2)), rand.randint(0, 2), rand.randint(0, 7), rand.random() < 0.25)
+        for id, c in charges
+    ))
+
+    actions = [(n + 1, charge, c) for n, (charge, c) in enumerate(
+        (charge, c) for charge, c in charges for _ in range(size["actions_per_charge"]))]
+
+    counts["actions"] = copy_rows(cursor, "actions",
+        ["id", "title", "description", "assigned_to", "charge", "created_at", "status"], (
+        (id, rand.choice(titles), rand.choice(sentences), rand.choice(members[c]),
+            charge, created_at(), rand.randint(0, 6))
+        for id, charge, c in actions
+    ))
+
+    counts["notes"] = copy_rows(cursor, "notes",
+        ["id", "description", "status", "author", "action", "created_at", "hidden"], (
+        (n + 1, " ".join(rand.sample(sentences, 3)), 0, rand.choice(members[c]), action, created_at(), False)
+        for n, (action, c) in enumerate(
+            (action, c) for action, _, c in actions for _ in range(size["notes_per_action"]))
+    ))
+
+    minutes = [(n + 1, c) for n, c in enumerate(
+        c for c in committees for _ in range(size["minutes_per_committee"]))]
+
+    counts["minutes"] = copy_rows(cursor, "minutes", ["id", "title", "body", "date", "private", "committee_id"], (
+        (id, rand.choice(titles), " ".join(rand.sample(sentences, 5)),
+            int((now - timedelta(seconds = rand.randrange(span))).timestamp()), rand.random() < 0.5, c)
+        for id, c in minutes
+    ))
+
+    committee_charges = {}
+    for id, c in charges:
+        committee_charges.setdefault(c, []).append(id)
+
+    counts["relevant_charges"] = copy_rows(cursor, "relevant_charges", ["minute_id", "charge_id"], (
+        (id, charge)
+        for id, c in minutes for charge in committee_charges.get(c, [])[:size["charges_per_minute"]]
+    ))
+
+    counts["committee_notes"] = copy_rows(cursor, "committee_notes",
+        ["id", "description", "author", "committee", "created_at", "hidden"], (
+        (n + 1, " ".join(rand.sample(sentences, 3)), members[c][0], c, created_at(), False)
+        for n, c in enumerate(
+            c for c in committees for _ in range(size["committee_notes_per_committee"]))
+    ))
+
+    counts["notifications"] = copy_rows(cursor, "notifications",
+        ["user", "type", "destination", "message", "redirect"], (
+        (u, rand.choice(NOTIFICATION_TYPES), str(rand.randint(1, len(charges))), rand.choice(sentences),
+            "/charge/{}".format(rand.randint(1, len(charges))))
+        for u in users for _ in range(size["notifications_per_user"])
+    ))
+
+    # Rows were written with their ids, move the sequences past them.
+    for table in ["charges", "actions", "notes", "minutes", "committee_notes"]:
+        cursor.execute("SELECT setval(pg_get_serial_sequence('{0}', 'id'), (SELECT max(id) FROM {0}))".format(table))
+
+    return counts
+
+
+def main():
+    import config
+    from sqlalchemy import create_engine
+    from app import create_app, db
+
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    url = sys.argv[2] if len(sys.argv) > 2 else config.SQLALCHEMY_DATABASE_URI
+    create_app(handlers = False)
+    engine = create_engine(url)
+
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+
+    start = time.time()
+    with engine.begin() as conn:
+        counts = generate(conn, scale = scale)
+
+    for table, count in counts.items():
+        print("{:>16} {:>10}".format(table, count))
+    print("Generated scale {} in {:.1f}s".format(scale, time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+filename: email_build.py
+description: Measures the time the worker takes to build an email.
+created on: 10/18/26
+
+Usage:
+    python benchmarks/email_build.py [messages]
+
+Compares build_message, which reuses the encoded image parts, with
+reading and encoding the images for every message.
+"""
+
+import os
+import sys
+import time
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.email.controllers import build_message, INLINE_IMAGES, STATIC_DIR
+
+MESSAGE = {
+    "title": "You're Invited",
+    "sender": ("SG TigerTracker", "sgnoreply@rit.edu"),
+    "recipients": ["testuser@rit.edu"],
+    "subtype": "related",
+    "html": "<p>" + "Test invitation. " * 200 + "</p>"
+}
+
+
+# Builds a message reading the images from disk each time.
+def build_uncached(msg):
+    mime = MIMEMultipart(msg["subtype"])
+    mime['Subject'] = msg["title"]
+    mime['From'] = formataddr(msg["sender"])
+    mime['To'] = ", ".join(msg["recipients"])
+    mime.attach(MIMEText(msg["html"], 'html'))
+
+    for name, content_id in INLINE_IMAGES:
+        with open(os.path.join(STATIC_DIR, name), "rb") as fp:
+            part = MIMEImage(fp.read())
+        part.add_header('Content-ID', content_id)
+        mime.attach(part)
+    return mime
+
+
+##
+## @brief      Times building and serializing messages.
+##
+## @return     Microseconds per message.
+##
+def measure(build, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        build(MESSAGE).as_string()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    build_message(MESSAGE)
+
+    print("uncached: {:8.1f} us/message".format(measure(build_uncached, count)))
+    print("cached:   {:8.1f} us/message".format(measure(build_message, count)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+filename: loadtest.py
+description: Socket.IO load test that replays the flows of simulated users.
+created on: 10/18/26
+
+Usage:
+    python benchmarks/dataset.py 100
+    python run.py
+    python benchmarks/loadtest.py --scale 100 --users 200 --duration 60
+
+The dataset and the server run with the app's requirements. The load
+test runs in its own virtualenv with benchmarks/requirements.txt, whose
+Socket.IO client would replace the server's python-socketio. It only
+needs the same APP_SECRET_KEY as the server to sign the user tokens.
+
+Each simulated user connects, logs in with its token and then runs
+weighted flows with a random think time between them until the end of
+the test. A request is timed from the emit until the reply with the
+same event name. The report has the replies per second and the p50, p95
+and p99 latencies of each event.
+"""
+
+import argparse
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import socketio
+from itsdangerous import TimedJSONWebSignatureSerializer as Serializer
+from benchmarks.dataset import SIZES
+
+
+# Flows and how often they are picked.
+FLOWS = {
+    "browse": 5,
+    "notifications": 3,
+    "comment": 1,
+}
+
+EVENTS = ["verify_auth", "get_committees", "get_charges", "get_actions", "create_note", "get_notifications"]
+
+
+##
+## @brief      Latencies of the replies, by event name.
+##
+class Stats():
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def add(self, event, seconds):
+        with self.lock:
+            self.latencies.setdefault(event, []).append(seconds)
+
+    def error(self, event):
+        with self.lock:
+            self.errors[event] = self.errors.get(event, 0) + 1
+
+    def report(self, duration):
+        print("{:<20} {:>8} {:>8} {:>9} {:>9} {:>9} {:>7}".format(
+            "event", "count", "per sec", "p50 ms", "p95 ms", "p99 ms", "errors"))
+
+        for event in EVENTS:
+            times = sorted(self.latencies.get(event, []))
+            if not times and event not in self.errors:
+                continue
+
+            print("{:<20} {:>8} {:>8.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>7}".format(
+                event, len(times), len(times) / duration,
+                percentile(times, 50), percentile(times, 95), percentile(times, 99),
+                self.errors.get(event, 0)))
+
+
+def percentile(times, p):
+    if not times:
+        return 0.0
+    index = min(len(times) - 1, int(round(p / 100.0 * len(times) + 0.5)) - 1)
+    return times[max(index, 0)] * 1000
+
+
+##
+## @brief      A simulated user with its own connection.
+##
+class User():
+
+    def __init__(self, number, args, stats, rand):
+        self.args = args
+        self.stats = stats
+        self.rand = rand
+        self.replies = {event: queue.Queue() for event in EVENTS}
+        self.client = socketio.Client(reconnection = False)
+
+        for event in EVENTS:
+            self.client.on(event, self.replies[event].put)
+
+        # The dataset gives each committee its own slice of users.
+        per_committee = SIZES["members_per_committee"] + 1
+        committees = SIZES["committees"] * args.scale
+        charges = SIZES["charges_per_committee"]
+        actions = SIZES["actions_per_charge"]
+
+        self.id = "TestUser{}".format(number)
+        self.committee = min(number // per_committee, committees - 1)
+        self.charges = [self.committee * charges + c + 1 for c in range(charges)]
+        self.actions = [(charge - 1) * actions + a + 1 for charge in self.charges for a in range(actions)]
+        self.token = Serializer(config.SECRET_KEY, expires_in = 3600).dumps({"id": self.id}).decode('ascii')
+
+    ##
+    ## @brief      Sends an event and waits for its reply.
+    ##
+    ## @return     The reply, None if it timed out.
+    ##
+    def request(self, event, *data):
+        replies = self.replies[event]
+        while not replies.empty():
+            replies.get_nowait()
+
+        start = time.perf_counter()
+        self.client.emit(event, *data)
+
+        try:
+            reply = replies.get(timeout = self.args.timeout)
+        except queue.Empty:
+            self.stats.error(event)
+            return None
+
+        self.stats.add(event, time.perf_counter() - start)
+        return reply
+
+    def browse(self):
+        self.request("get_committees")
+        self.request("get_charges", {"token": self.token, "committee_id": "TestCommittee{}".format(self.committee)})
+        self.request("get_actions", self.rand.choice(self.charges))
+
+    def notifications(self):
+        self.request("get_notifications", {"token": self.token, "limit": 50})
+
+    def comment(self):
+        self.request("get_actions", self.rand.choice(self.charges))
+        self.request("create_note", {
+            "token": self.token,
+            "action": self.rand.choice(self.actions),
+            "description": "Load test note"
+        })
+
+    def run(self, deadline):
+        try:
+            self.client.connect(self.args.url)
+        except Exception:
+            self.stats.error("connect")
+            return
+
+        self.request("verify_auth", {"token": self.token})
+        flows, weights = zip(*FLOWS.items())
+
+        while time.time() < deadline:
+            getattr(self, self.rand.choices(flows, weights)[0])()
+            time.sleep(min(self.rand.expovariate(1.0 / self.args.think), max(0, deadline - time.time())))
+
+        self.client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Socket.IO load test.")
+    parser.add_argument("--url", default = "http://localhost:5000")
+    parser.add_argument("--scale", type = int, default = 1, help = "scale of the generated dataset")
+    parser.add_argument("--users", type = int, default = 50, help = "simulated users")
+    parser.add_argument("--duration", type = float, default = 30, help = "seconds to run")
+    parser.add_argument("--ramp", type = float, default = 5, help = "seconds to start every user")
+    parser.add_argument("--think", type = float, default = 1, help = "mean seconds between flows")
+    parser.add_argument("--timeout", type = float, default = 10, help = "seconds to wait for a reply")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    users = min(args.users, SIZES["users"] * args.scale)
+    stats = Stats()
+    rand = random.Random(args.seed)
+    start = time.time()
+    deadline = start + args.ramp + args.duration
+    threads = []
+
+    for number in range(users):
+        user = User(number, args, stats, random.Random(rand.random()))
+        thread = threading.Thread(target = user.run, args = (deadline,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp / users)
+
+    for thread in threads:
+        thread.join()
+
+    print("{} users for {:.0f}s against {}\n".format(users, time.time() - start, args.url))
+    stats.report(time.time() - start)
+
+    if stats.errors.get("connect"):
+        print("\n{} users could not connect".format(stats.errors["connect"]))
+
+
+if __name__ == '__main__':
+    main()
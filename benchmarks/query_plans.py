@@ -0,0 +1,142 @@
+"""
+filename: query_plans.py
+description: Compares the query plans of the controllers' filters
+with and without the secondary indexes.
+created on: 10/18/26
+
+Usage:
+    python benchmarks/query_plans.py [database url] [scale]
+
+The database (SQLALCHEMY_TEST_DATABASE_URI by default) is dropped and
+seeded with `scale` committees worth of data, do not point it at a
+database you want to keep.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from sqlalchemy import create_engine, text
+from app import create_app, db
+from app.users.models import Users
+from app.committees.models import Committees
+from app.members.models import Members
+from app.charges.models import Charges
+from app.actions.models import Actions
+from app.notes.models import Notes
+from app.notifications.models import Notifications
+from app.minutes.models import Minutes
+from app.invitations.models import Invitations
+from app.committee_notes.models import CommitteeNotes
+
+
+# Rows per committee, the totals grow linearly with the scale.
+SEED = [
+    """INSERT INTO users (id, first_name, last_name, email, is_admin)
+       SELECT 'user' || n, 'First', 'Last', 'user' || n || '@test.com', n % 100 = 0
+       FROM generate_series(1, :scale * 50) n""",
+    """INSERT INTO committees (id, title, description, head, location, meeting_time, meeting_day, enabled)
+       SELECT 'committee' || n, 'Committee', 'Description', 'user' || n, 'Location', '1300', 2, true
+       FROM generate_series(1, :scale) n""",
+    """INSERT INTO members (committees_id, users_id, role)
+       SELECT 'committee' || c, 'user' || (c * 50 - u), 'NormalMember'
+       FROM generate_series(1, :scale) c, generate_series(0, 19) u""",
+    """INSERT INTO charges (title, author, description, committee, priority, status, private)
+       SELECT 'Charge', 'user1', 'Description', 'committee' || (n % :scale + 1), 0, 0, n % 4 = 0
+       FROM generate_series(1, :scale * 20) n""",
+    """INSERT INTO actions (title, description, assigned_to, charge, status)
+       SELECT 'Action', 'Description', 'user' || (n % (:scale * 50) + 1), n % (:scale * 20) + 1, 0
+       FROM generate_series(1, :scale * 100) n""",
+    """INSERT INTO notes (description, status, author, action, hidden)
+       SELECT 'Note', 0, 'user1', n % (:scale * 100) + 1, false
+       FROM generate_series(1, :scale * 300) n""",
+    """INSERT INTO notifications ("user", type, destination, message, redirect)
+       SELECT 'user' || (n % (:scale * 50) + 1), 'MentionedInNote', '1', 'Message', '/'
+       FROM generate_series(1, :scale * 500) n""",
+    """INSERT INTO minutes (title, body, date, private, committee_id)
+       SELECT 'Minute', 'Body', 0, n % 2 = 0, 'committee' || (n % :scale + 1)
+       FROM generate_series(1, :scale * 30) n""",
+    """INSERT INTO invitations (user_name, committee_id, "isInvite")
+       SELECT 'user' || (n % (:scale * 50) + 1), 'committee' || (n % :scale + 1), true
+       FROM generate_series(1, :scale * 10) n""",
+    """INSERT INTO committee_notes (description, author, committee)
+       SELECT 'Note', 'user1', 'committee' || (n % :scale + 1)
+       FROM generate_series(1, :scale * 30) n""",
+]
+
+app = create_app(handlers = False)
+app.app_context().push()
+
+# The filters used by the hot handlers.
+QUERIES = {
+    "get_charges": Charges.query.filter_by(committee= 'committee1', private= False),
+    "get_actions": Actions.query.filter_by(charge= 1),
+    "assigned actions": Actions.query.filter_by(assigned_to= 'user1'),
+    "get_notes": Notes.query.filter_by(action= 1),
+    "get_notifications": Notifications.query.filter_by(user= 'user1'),
+    "get_minutes": Minutes.query.filter_by(committee_id= 'committee1'),
+    "invitations": Invitations.query.filter_by(committee_id= 'committee1', user_name= 'user1'),
+    "get_committee_notes": CommitteeNotes.query.filter_by(committee= 'committee1'),
+    "user committees": Members.query.filter_by(users_id= 'user1'),
+}
+
+
+##
+## @brief      Gets the query plan and execution time of each query.
+##
+## @param      conn  The database connection.
+##
+## @return     Dict of name to (plan, milliseconds).
+##
+def explain(conn):
+    plans = {}
+
+    for name, query in QUERIES.items():
+        statement = query.statement.compile(conn, compile_kwargs={"literal_binds": True})
+        rows = conn.execute(text("EXPLAIN ANALYZE " + str(statement))).fetchall()
+        plan = [row[0] for row in rows]
+        ms = float(plan[-1].split(":")[1].split()[0])
+        plans[name] = (plan[0].strip(), ms)
+    return plans
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else config.SQLALCHEMY_TEST_DATABASE_URI
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    engine = create_engine(url)
+    indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+
+    for index in indexes:
+        index.drop(engine)
+
+    start = time.time()
+    with engine.begin() as conn:
+        for statement in SEED:
+            conn.execute(text(statement), scale= scale)
+    print("Seeded scale {} in {:.1f}s".format(scale, time.time() - start))
+
+    with engine.connect() as conn:
+        conn.execute("ANALYZE")
+        before = explain(conn)
+
+        for index in indexes:
+            index.create(conn)
+        conn.execute("ANALYZE")
+        after = explain(conn)
+
+    for name in QUERIES:
+        print("\n{}".format(name))
+        print("  before {:8.3f} ms  {}".format(before[name][1], before[name][0]))
+        print("  after  {:8.3f} ms  {}".format(after[name][1], after[name][0]))
+
+    db.metadata.drop_all(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+filename: startup.py
+description: Measures how long each kind of process takes to start.
+created on: 10/18/26
+
+Usage:
+    python benchmarks/startup.py [runs] [old checkout]
+
+Every measurement runs in a fresh interpreter, so module caches do not
+carry over between runs. Pass the path of a checkout from before the app
+factory (e.g. from `git worktree add`) to compare its `import app`.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = """
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+CASES = [
+    ("import app", "import app"),
+    ("worker (huey tasks)", "import worker"),
+    ("create_app(handlers=False)", "from app import create_app; create_app(handlers = False)"),
+    ("create_app()", "from app import create_app; create_app()"),
+]
+
+
+##
+## @brief      Runs a snippet in new interpreters and times it.
+##
+## @param      code  The snippet to time.
+## @param      cwd   The checkout to run it in.
+## @param      runs  Number of runs.
+##
+## @return     The median time in milliseconds.
+##
+def measure(code, cwd, runs):
+    times = []
+
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", TIMER.format(code)], cwd= cwd)
+        times.append(float(output.decode().strip().splitlines()[-1]) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    old = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if old:
+        print("{:30} {:10.1f} ms".format("before: import app", measure("import app", old, runs)))
+
+    for name, code in CASES:
+        print("{:30} {:10.1f} ms".format(name, measure(code, ROOT, runs)))
+
+
+if __name__ == '__main__':
+    main()
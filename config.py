@@ -19,11 +19,45 @@ SQLALCHEMY_TRACK_MODIFICATIONS = False
 # Secret key for signing tokens
 SECRET_KEY = os.environ.get('APP_SECRET_KEY', '')
 
+# Verified token cache, number of tokens and seconds they are kept.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 300))
+
+# Seconds the list of admin users is cached for.
+ADMIN_CACHE_TTL = int(os.environ.get('ADMIN_CACHE_TTL', 60))
+
+# Committee roles cache, number of users and seconds they are kept. The
+# TTL bounds how long other processes keep a removed member's roles.
+MEMBERSHIP_CACHE_SIZE = int(os.environ.get('MEMBERSHIP_CACHE_SIZE', 10000))
+MEMBERSHIP_CACHE_TTL = int(os.environ.get('MEMBERSHIP_CACHE_TTL', 30))
+
+# Message queue shared by every Flask process so Socket.IO broadcasts
+# reach clients connected to other nodes, e.g. redis://redis:6379/0.
+# Leave unset to run a single process without a queue.
+# Removing a member only takes the connections on the node that handled
+# the removal out of the committee's members room. Their connections on
+# other nodes keep getting private charge changes until they reconnect.
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE', None)
+
+# Default and largest page size of the paginated list handlers.
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 50))
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 200))
+
 # Email configuration
 MAIL_SERVER = os.environ.get('MAIL_HOST', 'mymail.rit.edu')
 MAIL_PORT = 465
 MAIL_USERNAME = os.environ.get('MAIL_USERNAME', '')
 MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')
+MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() == 'true'
+
+# Open SMTP sessions kept by each worker, and seconds a session can be
+# idle before it is checked with NOOP.
+MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE', 4))
+MAIL_POOL_CHECK_AFTER = int(os.environ.get('MAIL_POOL_CHECK_AFTER', 30))
+
+# Seconds invitation and close request emails are held to be sent as one
+# digest per recipient. 0 sends each email right away.
+EMAIL_DIGEST_WINDOW = int(os.environ.get('EMAIL_DIGEST_WINDOW') or 0)
 
 SAML_SETTINGS_PATH = os.environ.get('SAML_SETTINGS', 'saml')
 
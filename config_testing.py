@@ -0,0 +1,13 @@
+"""
+filename: config_testing.py
+description: Configuration for the test suite.
+created on: 10/18/26
+"""
+from config import *
+
+TESTING = True
+SQLALCHEMY_DATABASE_URI = SQLALCHEMY_TEST_DATABASE_URI
+
+# The Socket.IO test client only works without a message queue, even
+# when the container sets one.
+SOCKETIO_MESSAGE_QUEUE = None
@@ -0,0 +1,161 @@
+"""Baseline schema, as created by db.create_all()
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases made with db.create_all() before migrations were added
+    # already have this schema, the revision is only recorded for them.
+    if 'users' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('users',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('first_name', sa.String(length=255), nullable=True),
+        sa.Column('last_name', sa.String(length=255), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+    op.create_table('committees',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('head', sa.String(), nullable=True),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column('committee_img', sa.LargeBinary(), nullable=True),
+        sa.Column('meeting_time', sa.String(length=4), nullable=True),
+        sa.Column('meeting_day', sa.Integer(), nullable=True),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['head'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+    op.create_table('members',
+        sa.Column('committees_id', sa.String(length=255), nullable=False),
+        sa.Column('users_id', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['committees_id'], ['committees.id'], ),
+        sa.ForeignKeyConstraint(['users_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('committees_id', 'users_id')
+    )
+    op.create_table('charges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('committee', sa.String(length=255), nullable=True),
+        sa.Column('objectives', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('schedule', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('resources', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('stakeholders', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('paw_links', sa.String(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=True),
+        sa.Column('private', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['author'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['committee'], ['committees.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+    op.create_table('actions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('assigned_to', sa.String(), nullable=True),
+        sa.Column('charge', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['charge'], ['charges.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+    op.create_table('notes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('action', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('hidden', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['action'], ['actions.id'], ),
+        sa.ForeignKeyConstraint(['author'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+    op.create_table('notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user', sa.String(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('destination', sa.String(), nullable=True),
+        sa.Column('message', sa.String(), nullable=True),
+        sa.Column('redirect', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['user'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('minutes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('body', sa.String(), nullable=True),
+        sa.Column('date', sa.BigInteger(), nullable=True),
+        sa.Column('private', sa.Boolean(), nullable=True),
+        sa.Column('committee_id', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['committee_id'], ['committees.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('relevant_charges',
+        sa.Column('charge_id', sa.Integer(), nullable=True),
+        sa.Column('minute_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['charge_id'], ['charges.id'], ),
+        sa.ForeignKeyConstraint(['minute_id'], ['minutes.id'], )
+    )
+    op.create_table('invitations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_name', sa.String(length=255), nullable=True),
+        sa.Column('committee_id', sa.String(length=255), nullable=True),
+        sa.Column('charge_id', sa.Integer(), nullable=True),
+        sa.Column('isInvite', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['committee_id'], ['committees.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('committee_notes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('author', sa.String(), nullable=True),
+        sa.Column('committee', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['author'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['committee'], ['committees.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('committee_notes')
+    op.drop_table('invitations')
+    op.drop_table('relevant_charges')
+    op.drop_table('minutes')
+    op.drop_table('notifications')
+    op.drop_table('notes')
+    op.drop_table('actions')
+    op.drop_table('charges')
+    op.drop_table('members')
+    op.drop_table('committees')
+    op.drop_table('users')
@@ -0,0 +1,44 @@
+"""Index the foreign keys filtered on by the controllers
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_charges_committee_private', 'charges', ['committee', 'private']),
+    ('ix_actions_charge', 'actions', ['charge']),
+    ('ix_actions_assigned_to', 'actions', ['assigned_to']),
+    ('ix_notes_action', 'notes', ['action']),
+    ('ix_notifications_user', 'notifications', ['user']),
+    ('ix_minutes_committee_id', 'minutes', ['committee_id']),
+    ('ix_invitations_committee_id', 'invitations', ['committee_id']),
+    ('ix_invitations_user_name', 'invitations', ['user_name']),
+    ('ix_committee_notes_committee', 'committee_notes', ['committee']),
+    ('ix_members_users_id', 'members', ['users_id']),
+]
+
+
+def upgrade():
+    # A database made by db.create_all() already has the indexes.
+    inspector = sa.inspect(op.get_bind())
+
+    for name, table, columns in INDEXES:
+        if name not in [index['name'] for index in inspector.get_indexes(table)]:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
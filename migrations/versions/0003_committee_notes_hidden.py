@@ -0,0 +1,28 @@
+"""Add the hidden flag of committee notes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database made by db.create_all() already has the column.
+    columns = [column['name'] for column in sa.inspect(op.get_bind()).get_columns('committee_notes')]
+
+    if 'hidden' not in columns:
+        op.add_column('committee_notes', sa.Column('hidden', sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('committee_notes', 'hidden')
@@ -1,4 +1,14 @@
-from app import app, socketio
+import os
+
+# The Redis client used by the Socket.IO message queue must be
+# cooperative when running under eventlet.
+if os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+	import eventlet
+	eventlet.monkey_patch()
+
+from app import create_app, socketio
+
+app = create_app()
 
 if __name__ == '__main__':
-	socketio.run(app, host='0.0.0.0')
\ No newline at end of file
+	socketio.run(app, host='0.0.0.0')
@@ -0,0 +1,19 @@
+"""
+filename: worker.py
+description: Entry point for the huey consumer.
+created on: 10/18/26
+
+Run with `huey_consumer worker.huey`. Only the task modules are imported,
+tasks that need the database create the app on first use.
+
+Notifications are only queued when SOCKETIO_MESSAGE_QUEUE is set, the
+worker pushes them through it. Without a queue the web processes
+deliver them and the worker only sends emails.
+"""
+
+import sentry_sdk
+sentry_sdk.init()
+
+from app.email.models import huey
+import app.email.controllers
+import app.notifications.controllers